@@ -1,10 +1,13 @@
 from PySide6.QtGui import Qt
-from PySide6.QtWidgets import QWidget, QPushButton, QListWidget, QComboBox, QSlider, QDoubleSpinBox
+from PySide6.QtWidgets import QWidget, QPushButton, QListWidget, QComboBox, QSlider, QDoubleSpinBox, QSpinBox
 import numpy as np
-from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QDialog, QDialogButtonBox
+from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QDialog, QDialogButtonBox, QFormLayout, QApplication, \
+    QMessageBox
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-from scipy import signal
+
+from AllPassOptimizer import optimize_all_pass
+from Filter import batch_frequency_response
 
 
 class AllPassFiltersListWidget(QWidget):
@@ -37,7 +40,9 @@ class AllPassFiltersListWidget(QWidget):
         # Add button section
         add_layout = QHBoxLayout()
         self.add_apf_btn = QPushButton("Add All-Pass Filter")
+        self.optimize_apf_btn = QPushButton("Optimize...")
         add_layout.addWidget(self.add_apf_btn)
+        add_layout.addWidget(self.optimize_apf_btn)
 
         # Add everything to main layout
         main_layout.addLayout(apf_layout)
@@ -46,6 +51,7 @@ class AllPassFiltersListWidget(QWidget):
     def setup_connections(self):
         self.clear_apf_btn.clicked.connect(self.clear_all)
         self.add_apf_btn.clicked.connect(self.show_add_apf_dialog)
+        self.optimize_apf_btn.clicked.connect(self.show_optimize_dialog)
         self.apf_list.itemDoubleClicked.connect(self.delete_apf)
 
     def update_from_filter(self, filter_instance):
@@ -78,6 +84,27 @@ class AllPassFiltersListWidget(QWidget):
                 self.apf_list.addItem(f"a: {a:.3f}, θ: {theta:.3f}")
                 self.notify_filter_change()
 
+    def show_optimize_dialog(self):
+        """Append all-pass sections found by the optimizer to flatten the group delay"""
+        dialog = OptimizeAllPassDialog(self, self.filter)
+        if not dialog.exec():
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            sections, _ = optimize_all_pass(self.filter, dialog.get_section_count(), dialog.get_band(),
+                                            n_starts=dialog.get_start_count())
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if not sections:
+            QMessageBox.information(self, "Optimize All-Pass Filters",
+                                    "No all-pass sections reduce the group delay ripple over this band.")
+            return
+
+        # Without a sender the list is refilled through update_from_filter like every other view
+        self.filter.update_all_pass_filters(self.filter.all_pass_filters + sections, None)
+
     def delete_apf(self, item):
         """Delete the selected all-pass filter from the list and the filter instance."""
 
@@ -252,11 +279,9 @@ class AddAllPassFilterDialog(QDialog):
         zero = zero * np.exp(1j * angle)
         pole = pole * np.exp(1j * angle)
 
-        # Calculate the phase response of the inputted filter
-        tf = signal.zpk2tf([zero], [pole], 1)
-        w, h = signal.freqz(*tf, worN=1024)
-        all_pass_phase = np.angle(h)
-        all_pass_phase = np.unwrap(all_pass_phase)
+        # Calculate the phase response of the inputted filter, straight from its zero and pole
+        w, _, phase = batch_frequency_response([([zero], [pole], 1)], num_points=len(self.filter_phase_response))
+        all_pass_phase = np.unwrap(phase[0])
 
         # Clear the plot
         self.ax.clear()
@@ -278,3 +303,61 @@ class AddAllPassFilterDialog(QDialog):
 
     def get_angle(self):
         return self.angle_spinbox.value()
+
+
+class OptimizeAllPassDialog(QDialog):
+    def __init__(self, parent=None, filter_instance=None):
+        super().__init__(parent)
+        self.setWindowTitle("Optimize All-Pass Filters")
+
+        layout = QFormLayout()
+
+        self.sections_spinbox = QSpinBox()
+        self.sections_spinbox.setRange(1, 16)
+        self.sections_spinbox.setValue(4)
+        layout.addRow("Sections:", self.sections_spinbox)
+
+        # Band edges in multiples of π, defaulting to the filter's passband
+        band_start, band_end = self.estimate_passband(filter_instance)
+        self.band_start_spinbox = QDoubleSpinBox()
+        self.band_end_spinbox = QDoubleSpinBox()
+        for spinbox, value in [(self.band_start_spinbox, band_start), (self.band_end_spinbox, band_end)]:
+            spinbox.setRange(0.0, 1.0)
+            spinbox.setSingleStep(0.05)
+            spinbox.setDecimals(3)
+            spinbox.setSuffix("π")
+            spinbox.setValue(value)
+        layout.addRow("Band start (ω):", self.band_start_spinbox)
+        layout.addRow("Band end (ω):", self.band_end_spinbox)
+
+        self.starts_spinbox = QSpinBox()
+        self.starts_spinbox.setRange(1, 64)
+        self.starts_spinbox.setValue(8)
+        layout.addRow("Random starts:", self.starts_spinbox)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addRow(self.button_box)
+
+        self.setLayout(layout)
+
+    def estimate_passband(self, filter_instance, threshold_db=-3):
+        """Band edges, in multiples of π, where the magnitude is within threshold_db of its peak"""
+        if filter_instance is None:
+            return 0.0, 1.0
+        w, magnitude_db, _ = filter_instance.get_frequency_response(method='zpk')
+        passband = w[magnitude_db >= np.max(magnitude_db) + threshold_db]
+        if len(passband) == 0:
+            return 0.0, 1.0
+        return passband[0] / np.pi, passband[-1] / np.pi
+
+    def get_section_count(self):
+        return self.sections_spinbox.value()
+
+    def get_band(self):
+        band_start, band_end = sorted([self.band_start_spinbox.value(), self.band_end_spinbox.value()])
+        return band_start * np.pi, band_end * np.pi
+
+    def get_start_count(self):
+        return self.starts_spinbox.value()
@@ -0,0 +1,134 @@
+"""
+Search for all-pass sections that flatten the group delay of a filter over a frequency band.
+
+Sections are returned as the {"a", "theta"} dicts used in Filter.all_pass_filters. Complex
+sections come in conjugate pairs (theta, -theta) so the filter stays realizable; an odd
+section count adds one real section, whose sign is carried by theta = 0 or π.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy import optimize
+
+from logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def section_group_delay(a, theta, w):
+    """
+    Group delay of all-pass sections with poles a·e^jθ, and its gradient.
+
+    τ(w) = (1 - a²) / (1 - 2a·cos(w - θ) + a²). Returns (τ, dτ/da, dτ/dθ), each an
+    (n_sections x n_freqs) array.
+    """
+    a, theta = np.asarray(a, dtype=float)[:, np.newaxis], np.asarray(theta, dtype=float)[:, np.newaxis]
+    cos_difference = np.cos(w[np.newaxis, :] - theta)
+    sin_difference = np.sin(w[np.newaxis, :] - theta)
+    denominator = 1 - 2 * a * cos_difference + a ** 2
+
+    delay = (1 - a ** 2) / denominator
+    d_a = (2 * (1 - a ** 2) * (cos_difference - a) - 2 * a * denominator) / denominator ** 2
+    d_theta = 2 * a * (1 - a ** 2) * sin_difference / denominator ** 2
+    return delay, d_a, d_theta
+
+
+def _split_parameters(x, n_pairs):
+    """Parameter vector -> (pair radii, pair angles, real section radii)"""
+    return x[:n_pairs], x[n_pairs:2 * n_pairs], x[2 * n_pairs:]
+
+
+def _ripple_objective(x, real_angles, base_delay, w, n_pairs):
+    """Variance of the total group delay over the band, and its gradient
+
+    real_angles fixes each real section at θ = 0 or π; only its radius is optimized.
+    """
+    radii, angles, real_radii = _split_parameters(x, n_pairs)
+
+    # A conjugate pair is a section at θ plus one at -θ; d/dθ of the second flips sign
+    delay, d_a, d_theta = section_group_delay(np.r_[radii, radii, real_radii],
+                                              np.r_[angles, -angles, real_angles], w)
+    total = base_delay + delay.sum(axis=0)
+    deviation = total - total.mean()
+
+    # d/dx mean(deviation²) = 2·mean(deviation·dτ/dx), as the deviations sum to zero
+    scale = 2 / len(w)
+    grad_a = scale * (d_a @ deviation)
+    grad_theta = scale * (d_theta @ deviation)
+    gradient = np.r_[grad_a[:n_pairs] + grad_a[n_pairs:2 * n_pairs],
+                     grad_theta[:n_pairs] - grad_theta[n_pairs:2 * n_pairs],
+                     grad_a[2 * n_pairs:]]
+    return np.mean(deviation ** 2), gradient
+
+
+def _minimize_from(x0, real_angles, base_delay, w, n_pairs, bounds):
+    result = optimize.minimize(_ripple_objective, x0, args=(real_angles, base_delay, w, n_pairs), jac=True,
+                               method='L-BFGS-B', bounds=bounds)
+    return result.fun, result.x, real_angles
+
+
+def _sections_from_parameters(x, real_angles, n_pairs, min_radius):
+    """Section dicts for a parameter vector, dropping sections left at the lower radius bound"""
+    radii, angles, real_radii = _split_parameters(x, n_pairs)
+    # L-BFGS-B lands exactly on the bound when a section doesn't help
+    threshold = min_radius * (1 + 1e-6)
+    sections = []
+    for a, theta in zip(radii, angles):
+        if a > threshold:
+            sections.append({"a": float(a), "theta": float(theta)})
+            sections.append({"a": float(a), "theta": float(-theta)})
+    for a, theta in zip(real_radii, real_angles):
+        if a > threshold:
+            sections.append({"a": float(a), "theta": float(theta)})
+    return sections
+
+
+def optimize_all_pass(filter_obj, n_sections, band=(0.0, np.pi), num_points=512, n_starts=8,
+                      min_radius=0.01, max_radius=0.95, workers=None, seed=None):
+    """
+    Find up to n_sections all-pass sections minimizing the group delay ripple of filter_obj over band.
+
+    The ripple is the variance of the combined group delay over the band (in rad/sample);
+    each start runs L-BFGS-B with analytic gradients. workers > 1 spreads the starts over
+    a process pool. Radii are kept in [min_radius, max_radius], and sections that end at
+    min_radius don't reduce the ripple and are left out, so fewer than n_sections may be
+    returned. Returns (sections, peak-to-peak delay in the band after equalization).
+    """
+    start_time = time.perf_counter()
+    w_all, base_delay = filter_obj.get_group_delay(num_points)
+    in_band = (w_all >= band[0]) & (w_all <= band[1])
+    if not np.any(in_band):
+        raise ValueError("The optimization band contains no frequency points")
+    w, base_delay = w_all[in_band], base_delay[in_band]
+
+    n_pairs, n_real = divmod(n_sections, 2)
+    bounds = ([(min_radius, max_radius)] * n_pairs + [(0.0, np.pi)] * n_pairs +
+              [(min_radius, max_radius)] * n_real)
+
+    # Starting points spread the poles over the band at random radii; the real
+    # section alternates between θ = 0 and θ = π across starts to try both signs
+    rng = np.random.default_rng(seed)
+    starts = [np.r_[rng.uniform(0.3, max_radius, n_pairs),
+                    np.sort(rng.uniform(max(band[0], 0.0), min(band[1], np.pi), n_pairs)),
+                    rng.uniform(0.3, max_radius, n_real)]
+              for _ in range(n_starts)]
+    real_angles = [np.full(n_real, np.pi * (i % 2)) for i in range(n_starts)]
+
+    args = (base_delay, w, n_pairs, bounds)
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_minimize_from, starts, real_angles,
+                                        *[[arg] * n_starts for arg in args]))
+    else:
+        results = [_minimize_from(x0, angles, *args) for x0, angles in zip(starts, real_angles)]
+
+    _, best_x, best_real_angles = min(results, key=lambda result: result[0])
+    sections = _sections_from_parameters(best_x, best_real_angles, n_pairs, min_radius)
+
+    delay, _, _ = section_group_delay([s["a"] for s in sections], [s["theta"] for s in sections], w)
+    total = base_delay + delay.sum(axis=0)
+    ripple = float(np.ptp(total))
+    logger.info(f'Optimized {len(sections)} of {n_sections} all-pass sections in {time.perf_counter() - start_time:.2f} s, '
+                f'group delay ripple {np.ptp(base_delay):.2f} -> {ripple:.2f} samples')
+    return sections, ripple
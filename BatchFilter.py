@@ -0,0 +1,158 @@
+"""
+Apply a saved filter to every signal file in a directory, without the GUI.
+
+    python BatchFilter.py my_filter.json captures/ --workers 8
+
+Each input '<name>.<ext>' is written next to it as '<name>.<ext>_filtered.dsig', so
+'rec.csv' and 'rec.dsig' in one directory don't share an output. Files are filtered
+block by block, so captures larger than memory are fine.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from Filter import Filter
+from Signal import DigitalSignal, write_binary_header
+from logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_PATTERNS = ('*.csv', '*.dsig', '*.npy')
+OUTPUT_SUFFIX = '_filtered'
+
+_worker_filter = None  # The filter loaded once per worker process
+
+
+def load_filter(filter_path):
+    """Load a filter saved with Filter.save_to_file"""
+    filter_obj = Filter()
+    filter_obj.load_from_file(filter_path)
+    return filter_obj
+
+
+def _init_worker(filter_path):
+    global _worker_filter
+    _worker_filter = load_filter(filter_path)
+
+
+def output_path_for(input_path):
+    """Output next to the input; the input's extension is kept so that same-named inputs don't collide"""
+    input_path = Path(input_path)
+    return input_path.with_name(f'{input_path.name}{OUTPUT_SUFFIX}.dsig')
+
+
+def find_signal_files(directory, patterns=DEFAULT_PATTERNS):
+    """Signal files in a directory, excluding outputs of previous runs"""
+    files = set()
+    for pattern in patterns:
+        files.update(path for path in Path(directory).glob(pattern) if path.is_file())
+    return sorted(path for path in files if not path.stem.endswith(OUTPUT_SUFFIX))
+
+
+def filter_csv_to_file(filter_obj, csv_file_path, output_path, form='auto', chunk_size=1_000_000):
+    """Stream a CSV signal through the filter into a .dsig file, one chunk at a time
+
+    Raises ValueError if the CSV holds no numeric samples; no output is left behind on errors.
+    """
+    stream = None
+    n_samples = 0
+    n_channels = 1
+    try:
+        with open(output_path, 'wb') as f:
+            write_binary_header(f, 0, n_channels, 0.0, np.dtype('<f8'))  # Rewritten once the length is known
+            for chunk in DigitalSignal.iter_csv(csv_file_path, chunk_size=chunk_size):
+                if stream is None:
+                    stream = chunk.stream_filter(filter_obj, form)
+                    n_channels = chunk.n_channels
+                f.write(stream.process(chunk.data).astype('<f8', copy=False).tobytes())
+                n_samples += len(chunk.data)
+
+            if n_samples == 0:
+                raise ValueError(f"No numeric samples in {csv_file_path}")
+            f.seek(0)
+            write_binary_header(f, n_samples, n_channels, stream.sampling_rate, np.dtype('<f8'))
+    except BaseException:
+        # A partial output would be skipped by later runs without --overwrite
+        Path(output_path).unlink(missing_ok=True)
+        raise
+    return n_samples
+
+
+def filter_file(input_path, form='auto', block_size=1_000_000, zero_phase=False):
+    """Filter one file with the worker's filter; returns (input path, samples, seconds)"""
+    start_time = time.perf_counter()
+    output_path = output_path_for(input_path)
+    if Path(input_path).suffix.lower() == '.csv' and not zero_phase:
+        n_samples = filter_csv_to_file(_worker_filter, input_path, output_path, form, block_size)
+    else:
+        # Zero-phase filtering looks ahead, so CSV inputs are loaded whole rather than streamed
+        signal = DigitalSignal.load(input_path)
+        if len(signal.data) == 0:
+            raise ValueError(f"No numeric samples in {input_path}")
+        signal.apply_filter_to_file(_worker_filter, output_path, form, block_size, zero_phase)
+        n_samples = len(signal.data)
+    return input_path, n_samples, time.perf_counter() - start_time
+
+
+def run_batch(filter_path, files, workers=None, form='auto', block_size=1_000_000, zero_phase=False):
+    """Filter files in a process pool, logging progress; returns the number of failures"""
+    workers = workers or os.cpu_count() or 1
+    failures = 0
+    start_time = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(filter_path),)) as executor:
+        futures = {executor.submit(filter_file, path, form, block_size, zero_phase): path for path in files}
+        for done, future in enumerate(as_completed(futures), start=1):
+            path = futures[future]
+            try:
+                _, n_samples, elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                logger.error(f'[{done}/{len(files)}] {path}: {e}')
+                continue
+            logger.info(f'[{done}/{len(files)}] {path.name}: {n_samples} samples in {elapsed:.2f} s '
+                        f'({n_samples / max(elapsed, 1e-9):,.0f} samples/s)')
+
+    logger.info(f'Filtered {len(files) - failures}/{len(files)} files in '
+                f'{time.perf_counter() - start_time:.2f} s with {workers} workers')
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply a saved filter to every signal file in a directory")
+    parser.add_argument("filter", help="Filter JSON file saved from the designer")
+    parser.add_argument("directory", help="Directory of .csv, .dsig or .npy signal files")
+    parser.add_argument("--pattern", action="append",
+                        help="Glob pattern of files to process, may be repeated (default: *.csv *.dsig *.npy)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument("--form", choices=["auto", "sos", "direct", "fft"], default="auto",
+                        help="Filter structure (default: auto)")
+    parser.add_argument("--block-size", type=int, default=1_000_000,
+                        help="Samples held in memory per file (default: 1000000)")
+    parser.add_argument("--zero-phase", action="store_true",
+                        help="Filter forward and backward for a phase-free output")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Re-filter files that already have an output")
+    args = parser.parse_args(argv)
+
+    load_filter(args.filter)  # Fail early on a bad filter file, before starting workers
+
+    files = find_signal_files(args.directory, args.pattern or DEFAULT_PATTERNS)
+    if not args.overwrite:
+        files = [path for path in files if not output_path_for(path).exists()]
+    if not files:
+        logger.info(f'No signal files to filter in {args.directory}')
+        return 0
+
+    return 1 if run_batch(args.filter, files, args.workers, args.form, args.block_size, args.zero_phase) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
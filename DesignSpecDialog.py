@@ -0,0 +1,180 @@
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QComboBox,
+                               QDoubleSpinBox, QPushButton, QListWidget, QListWidgetItem,
+                               QDialogButtonBox, QApplication)
+
+from FilterDesign import FAMILIES, minimum_order_designs
+
+
+class DesignSpecDialog(QDialog):
+    """Find the minimum-order design of each filter family for a passband/stopband spec"""
+
+    FAMILY_NAMES = {
+        "butterworth": "Butterworth",
+        "chebyshev": "Chebyshev",
+        "inverse_chebyshev": "Inverse Chebyshev",
+        "bessel": "Bessel",
+        "elliptic": "Elliptic",
+    }
+
+    # Starting (passband, stopband) edges for each response
+    DEFAULT_EDGES = {
+        "lpf": ([0.2, 0.5], [0.3, 0.6]),
+        "hpf": ([0.3, 0.5], [0.2, 0.6]),
+        "bpf": ([0.3, 0.5], [0.2, 0.6]),
+        "bsf": ([0.2, 0.6], [0.3, 0.5]),
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Design From Spec")
+        self.results = {}
+
+        layout = QVBoxLayout()
+        form_layout = QFormLayout()
+
+        self.response_combo = QComboBox()
+        for name, response in [("Low-Pass", "lpf"), ("High-Pass", "hpf"),
+                               ("Band-Pass", "bpf"), ("Band-Stop", "bsf")]:
+            self.response_combo.addItem(name, response)
+        form_layout.addRow("Response:", self.response_combo)
+
+        # Band edges, normalized to Nyquist; the second edge is only used by band filters
+        self.passband_spinboxes = self.create_edge_spinboxes(self.DEFAULT_EDGES["lpf"][0])
+        self.stopband_spinboxes = self.create_edge_spinboxes(self.DEFAULT_EDGES["lpf"][1])
+        form_layout.addRow("Passband edge(s):", self.edge_layout(self.passband_spinboxes))
+        form_layout.addRow("Stopband edge(s):", self.edge_layout(self.stopband_spinboxes))
+
+        self.ripple_spinbox = QDoubleSpinBox()
+        self.ripple_spinbox.setRange(0.01, 10.0)
+        self.ripple_spinbox.setValue(1.0)
+        self.ripple_spinbox.setSuffix(" dB")
+        form_layout.addRow("Max passband ripple:", self.ripple_spinbox)
+
+        self.attenuation_spinbox = QDoubleSpinBox()
+        self.attenuation_spinbox.setRange(1.0, 200.0)
+        self.attenuation_spinbox.setValue(40.0)
+        self.attenuation_spinbox.setSuffix(" dB")
+        form_layout.addRow("Min stopband attenuation:", self.attenuation_spinbox)
+        layout.addLayout(form_layout)
+
+        self.design_button = QPushButton("Find Minimum Orders")
+        layout.addWidget(self.design_button)
+
+        self.results_list = QListWidget()
+        layout.addWidget(self.results_list)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        self.button_box.button(QDialogButtonBox.Ok).setText("Load Design")
+        self.button_box.button(QDialogButtonBox.Ok).setEnabled(False)
+        self.button_box.accepted.connect(self.accept)
+        self.button_box.rejected.connect(self.reject)
+        layout.addWidget(self.button_box)
+
+        self.response_combo.currentIndexChanged.connect(self.response_changed)
+        # Results only hold for the spec they were found for
+        for spinbox in (self.passband_spinboxes + self.stopband_spinboxes +
+                        [self.ripple_spinbox, self.attenuation_spinbox]):
+            spinbox.valueChanged.connect(self.clear_results)
+        self.design_button.clicked.connect(self.find_designs)
+        self.results_list.currentItemChanged.connect(
+            lambda item, previous: self.button_box.button(QDialogButtonBox.Ok).setEnabled(item is not None))
+
+        self.setLayout(layout)
+        self.response_changed()
+
+    def create_edge_spinboxes(self, values):
+        spinboxes = []
+        for value in values:
+            spinbox = QDoubleSpinBox()
+            spinbox.setRange(0.001, 0.999)
+            spinbox.setDecimals(3)
+            spinbox.setSingleStep(0.01)
+            spinbox.setValue(value)
+            spinboxes.append(spinbox)
+        return spinboxes
+
+    def edge_layout(self, spinboxes):
+        edge_layout = QHBoxLayout()
+        for spinbox in spinboxes:
+            edge_layout.addWidget(spinbox)
+        edge_layout.addWidget(QLabel("× Nyquist"))
+        return edge_layout
+
+    def response_changed(self):
+        response = self.response_combo.currentData()
+        for spinboxes, values in zip([self.passband_spinboxes, self.stopband_spinboxes],
+                                     self.DEFAULT_EDGES[response]):
+            for spinbox, value in zip(spinboxes, values):
+                spinbox.setValue(value)
+
+        is_band = response in ("bpf", "bsf")
+        self.passband_spinboxes[1].setEnabled(is_band)
+        self.stopband_spinboxes[1].setEnabled(is_band)
+
+    def clear_results(self):
+        self.results_list.clear()
+        self.results = {}
+        self.status_label.setText("")
+
+    def get_spec(self):
+        if self.response_combo.currentData() in ("bpf", "bsf"):
+            passband = [spinbox.value() for spinbox in self.passband_spinboxes]
+            stopband = [spinbox.value() for spinbox in self.stopband_spinboxes]
+        else:
+            passband, stopband = self.passband_spinboxes[0].value(), self.stopband_spinboxes[0].value()
+        return {'passband': passband, 'stopband': stopband,
+                'max_ripple': self.ripple_spinbox.value(),
+                'min_attenuation': self.attenuation_spinbox.value()}
+
+    def validate_spec(self, spec):
+        """Return an error message if the band edges don't describe the selected response, else None"""
+        response = self.response_combo.currentData()
+        passband, stopband = spec['passband'], spec['stopband']
+        if response == "lpf" and not passband < stopband:
+            return "The passband edge must be below the stopband edge."
+        if response == "hpf" and not passband > stopband:
+            return "The passband edge must be above the stopband edge."
+        if response == "bpf" and not stopband[0] < passband[0] < passband[1] < stopband[1]:
+            return "The passband must lie inside the stopband edges."
+        if response == "bsf" and not passband[0] < stopband[0] < stopband[1] < passband[1]:
+            return "The stopband must lie inside the passband edges."
+        return None
+
+    def find_designs(self):
+        self.clear_results()
+        spec = self.get_spec()
+        error = self.validate_spec(spec)
+        if error is not None:
+            self.status_label.setText(error)
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            self.results = minimum_order_designs(spec)
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        # Cheapest designs first
+        found = sorted((result['order'], family) for family, result in self.results.items() if result is not None)
+        for order, family in found:
+            result = self.results[family]
+            item = QListWidgetItem(f"{self.FAMILY_NAMES[family]}: order {order}, "
+                                   f"ripple {result['passband_ripple']:.2f} dB, "
+                                   f"attenuation {result['stopband_attenuation']:.1f} dB")
+            item.setData(Qt.UserRole, family)
+            self.results_list.addItem(item)
+        if found:
+            self.results_list.setCurrentRow(0)
+
+        missing = [self.FAMILY_NAMES[family] for family in FAMILIES if self.results.get(family) is None]
+        self.status_label.setText(f"No design up to the maximum order: {', '.join(missing)}" if missing else "")
+
+    def get_selected_design(self):
+        """The selected design dict (see FilterDesign), or None"""
+        item = self.results_list.currentItem()
+        if item is None:
+            return None
+        return self.results[item.data(Qt.UserRole)]
@@ -14,7 +14,7 @@ class ElementsListWidget(QWidget):
     def set_filter(self, filter_instance):
         """Connect to a filter instance"""
         self.filter = filter_instance
-        self.filter.subscribe(self.update_from_filter, self)
+        self.filter.subscribe(self.update_from_filter, self, live=True)
 
     def setup_ui(self):
         # Main layout
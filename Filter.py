@@ -1,14 +1,248 @@
 import numpy as np
 from scipy import signal
 import json
+from collections import Counter, OrderedDict
 from pathlib import Path
 
 
+def _root_contributions(roots, w):
+    """Natural-log distance and angle from each root to each point e^jw on the unit circle.
+
+    Returns two (n_roots x n_freqs) arrays; the response is the sum of their rows.
+    """
+    roots = np.asarray(roots, dtype=complex)
+    real_difference = np.cos(w)[np.newaxis, :] - roots.real[:, np.newaxis]
+    imag_difference = np.sin(w)[np.newaxis, :] - roots.imag[:, np.newaxis]
+    with np.errstate(divide='ignore'):
+        log_distance = 0.5 * np.log(real_difference ** 2 + imag_difference ** 2)
+    return log_distance, np.arctan2(imag_difference, real_difference)
+
+
+def _root_group_delays(roots, w):
+    """Derivative of the angle from each root to e^jw, d/dw arg(e^jw - c), per root and frequency.
+
+    For c = r e^jφ this is (1 - r cos(w - φ)) / |e^jw - c|^2. Returns an (n_roots x n_freqs)
+    array and a mask of the frequencies that land on a root, where it is undefined.
+    """
+    roots = np.asarray(roots, dtype=complex)
+    radius, angle = np.abs(roots)[:, np.newaxis], np.angle(roots)[:, np.newaxis]
+    cos_difference = np.cos(w[np.newaxis, :] - angle)
+    squared_distance = 1 - 2 * radius * cos_difference + radius ** 2
+    singular = squared_distance < 1e-12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delays = np.where(singular, 0.0, (1 - radius * cos_difference) / squared_distance)
+    return delays, np.any(singular, axis=0)
+
+
+def _log_magnitude_to_db(log_magnitude, epsilon=1e-12):
+    """Convert ln|H| to dB, matching 20 * log10(|H| + epsilon) without leaving log space"""
+    return 20 * np.logaddexp(log_magnitude, np.log(epsilon)) / np.log(10)
+
+
+def _wrap_phase(phase):
+    """Wrap phase to (-pi, pi]"""
+    return np.angle(np.exp(1j * phase))
+
+
+def _pad_roots(root_lists):
+    """Pack ragged root lists into an (n_sets x max_roots) array and the matching validity mask"""
+    max_roots = max((len(roots) for roots in root_lists), default=0)
+    padded = np.zeros((len(root_lists), max_roots), dtype=complex)
+    mask = np.zeros((len(root_lists), max_roots), dtype=bool)
+    for i, roots in enumerate(root_lists):
+        padded[i, :len(roots)] = roots
+        mask[i, :len(roots)] = True
+    return padded, mask
+
+
+# Largest ln|prod(e^jw - root)| evaluated as a plain product; far from float64 overflow at ~709
+_MAX_LOG_PRODUCT = 300.0
+# Complex elements per chunk of the product path (256 KiB)
+_PRODUCT_CHUNK_ELEMENTS = 16384
+
+
+def batch_frequency_response(zpk_sets, num_points=1024, method='zpk'):
+    """Frequency response of many filters at once, from their (zeros, poles, gain) sets
+
+    method='zpk' pads the ragged root lists into arrays and masks them, so the work is one
+    vectorized (n_filters x n_freqs) complex multiply per root slot rather than a Python loop
+    over filters; sets with enough or large enough roots to overflow are accumulated in log space.
+    method='tf' expands each set into polynomial coefficients and evaluates them all with one
+    matrix product; it is faster still but loses precision for high orders, like freqz.
+    Returns (w, magnitude_db, phase_rad) with magnitude and phase shaped (n_filters x n_freqs),
+    matching get_frequency_response(method=...) row by row.
+    """
+    w = np.linspace(0, np.pi, num_points, endpoint=False)
+    if method == 'tf':
+        return (w,) + _batch_tf_response(zpk_sets, w)
+    if method != 'zpk':
+        raise ValueError(f"Unknown frequency response method: {method}")
+
+    zeros, zero_mask = _pad_roots([list(zpk[0]) for zpk in zpk_sets])
+    poles, pole_mask = _pad_roots([list(zpk[1]) for zpk in zpk_sets])
+    gains = np.array([zpk[2] for zpk in zpk_sets], dtype=complex)
+
+    # Each factor is at most 1 + |root|, so this bounds ln|product| for every set
+    log_bound = max(np.sum(np.log1p(np.abs(roots)) * mask, axis=1).max(initial=0.0)
+                    for roots, mask in [(zeros, zero_mask), (poles, pole_mask)])
+    if log_bound < _MAX_LOG_PRODUCT:
+        magnitude_db = np.empty((len(zpk_sets), num_points))
+        phase = np.empty((len(zpk_sets), num_points))
+        # Rows are done in chunks small enough for the per-slot products to stay in cache,
+        # grouped by root count so that few chunks loop over padded slots
+        by_root_count = np.argsort(zero_mask.sum(axis=1) + pole_mask.sum(axis=1), kind='stable')
+        chunk_size = max(1, _PRODUCT_CHUNK_ELEMENTS // num_points)
+        for start in range(0, len(zpk_sets), chunk_size):
+            rows = by_root_count[start:start + chunk_size]
+            # A zero and pole on the same point of the unit circle leave NaN (0 / 0) at that frequency
+            with np.errstate(divide='ignore', invalid='ignore'):
+                h = (gains[rows, np.newaxis] * _padded_root_product(zeros[rows], zero_mask[rows], w) /
+                     _padded_root_product(poles[rows], pole_mask[rows], w))
+            magnitude_db[rows] = 20 * np.log10(np.abs(h) + 1e-12)
+            phase[rows] = np.angle(h)
+        return w, magnitude_db, phase
+
+    with np.errstate(divide='ignore'):
+        log_magnitude = np.repeat(np.log(np.abs(gains))[:, np.newaxis], num_points, axis=1)
+    # H(e^jw) = k * e^(jw(N - M)) * prod(e^jw - z) / prod(e^jw - p)
+    phase = np.angle(gains)[:, np.newaxis] + np.outer(pole_mask.sum(axis=1) - zero_mask.sum(axis=1), w)
+
+    # A zero and pole on the same point of the unit circle leave NaN (-inf + inf) at that frequency
+    with np.errstate(invalid='ignore'):
+        for roots, mask, sign in [(zeros, zero_mask, 1), (poles, pole_mask, -1)]:
+            for slot in range(roots.shape[1]):
+                filters = np.flatnonzero(mask[:, slot])
+                log_distance, angle = _root_contributions(roots[filters, slot], w)
+                log_magnitude[filters] += sign * log_distance
+                phase[filters] += sign * angle
+
+        return w, _log_magnitude_to_db(log_magnitude), _wrap_phase(phase)
+
+
+def _padded_root_product(roots, mask, w):
+    """prod(1 - root·e^-jw) over each row of a zero-padded root array, (n_sets x n_freqs)
+
+    This is e^-jwN · prod(e^jw - root), and the e^jw(N - M) factor of H cancels the e^-jwN
+    terms of numerator and denominator. Padded slots hold 0 and contribute a factor of 1.
+    """
+    inverse_unit_circle = np.exp(-1j * w)[np.newaxis, :]
+    product = np.ones((roots.shape[0], len(w)), dtype=complex)
+    term = np.empty_like(product)
+    for slot in range(np.max(np.sum(mask, axis=1), initial=0)):
+        # product *= 1 - root·e^-jw, without allocating
+        np.multiply(roots[:, slot, np.newaxis], inverse_unit_circle, out=term)
+        term *= product
+        product -= term
+    return product
+
+
+def _batch_tf_response(zpk_sets, w):
+    """(magnitude_db, phase_rad) of the transfer functions of zpk_sets, as one matrix product"""
+    n_coefficients = 1 + max((max(len(zpk[0]), len(zpk[1])) for zpk in zpk_sets), default=0)
+    numerators = np.zeros((len(zpk_sets), n_coefficients), dtype=complex)
+    denominators = np.zeros((len(zpk_sets), n_coefficients), dtype=complex)
+    for i, (zeros, poles, gain) in enumerate(zpk_sets):
+        # Coefficients of z^-n, as in zpk2tf/freqz
+        numerators[i, :len(zeros) + 1] = gain * np.poly(zeros)
+        denominators[i, :len(poles) + 1] = np.poly(poles)
+
+    powers = np.exp(-1j * np.outer(np.arange(n_coefficients), w))
+    h = (numerators @ powers) / (denominators @ powers)
+
+    _epsilon = 1e-12
+    return 20 * np.log10(np.abs(h) + _epsilon), np.angle(h)
+
+
+class _RootResponse:
+    """Aggregate log-magnitude and phase of a root set, kept up to date root by root.
+
+    H(w) is a product over the roots, so moving one root (or a conjugate pair) only
+    replaces its own contribution: O(n_freqs) per moved root instead of rebuilding
+    the whole (n_roots x n_freqs) sum.
+    """
+
+    # Rebuild from scratch periodically so rounding from repeated add/subtract can't build up
+    max_incremental_updates = 256
+
+    def __init__(self, num_points):
+        self.num_points = num_points
+        self.w = np.linspace(0, np.pi, num_points, endpoint=False)
+        self.zeros = Counter()
+        self.poles = Counter()
+        self.contributions = {}  # root -> (log distance row, angle row)
+        self.log_magnitude = np.zeros_like(self.w)
+        self.phase = np.zeros_like(self.w)
+        self.incremental_updates = 0
+
+    def update(self, zeros, poles):
+        """Bring the aggregate in line with the given root lists"""
+        zeros, poles = Counter(zeros), Counter(poles)
+        changes = [(zeros - self.zeros, 1), (self.zeros - zeros, -1),
+                   (self.poles - poles, 1), (poles - self.poles, -1)]
+        n_changed = sum(len(roots) for roots, _ in changes)
+
+        if n_changed == 0:
+            return
+        if (self.incremental_updates >= self.max_incremental_updates or
+                n_changed > (len(zeros) + len(poles)) // 2):
+            self._rebuild(zeros, poles)
+            return
+
+        updates = [(sign * count, self._contribution(root))
+                   for roots, sign in changes for root, count in roots.items()]
+        # A root on a grid frequency contributes -inf there, and subtracting it again would
+        # leave NaN (-inf + inf) in the aggregate, so those changes are summed from scratch
+        if not all(np.all(np.isfinite(log_distance)) for _, (log_distance, _) in updates):
+            self._rebuild(zeros, poles)
+            return
+
+        for weight, (log_distance, angle) in updates:
+            self.log_magnitude += weight * log_distance
+            self.phase += weight * angle
+
+        self.zeros, self.poles = zeros, poles
+        self.contributions = {root: self.contributions[root] for root in zeros + poles}
+        self.incremental_updates += 1
+
+    def _rebuild(self, zeros, poles):
+        self.zeros, self.poles = zeros, poles
+        self.contributions = {}
+        self.log_magnitude = np.zeros_like(self.w)
+        self.phase = np.zeros_like(self.w)
+
+        roots = list((zeros + poles).keys())
+        if roots:
+            log_distance, angle = _root_contributions(roots, self.w)
+            self.contributions = {root: (log_distance[i], angle[i]) for i, root in enumerate(roots)}
+            zero_counts = np.array([zeros[root] for root in roots])
+            pole_counts = np.array([poles[root] for root in roots])
+            self.log_magnitude = (zero_counts - pole_counts) @ log_distance
+            self.phase = (zero_counts - pole_counts) @ angle
+        self.incremental_updates = 0
+
+    def _contribution(self, root):
+        if root not in self.contributions:
+            log_distance, angle = _root_contributions([root], self.w)
+            self.contributions[root] = (log_distance[0], angle[0])
+        return self.contributions[root]
+
+    def response(self, gain):
+        """Return (w, magnitude_db, phase_rad) for the current roots and the given gain"""
+        n_zeros, n_poles = sum(self.zeros.values()), sum(self.poles.values())
+        with np.errstate(divide='ignore'):
+            log_magnitude = np.log(np.abs(gain)) + self.log_magnitude
+        # H(e^jw) = k * e^(jw(N - M)) * prod(e^jw - z) / prod(e^jw - p)
+        phase = np.angle(gain) + self.w * (n_poles - n_zeros) + self.phase
+
+        return self.w.copy(), _log_magnitude_to_db(log_magnitude), _wrap_phase(phase)
+
+
 class Filter:
     def __init__(self):
         self.zeros = []  # List of complex numbers
         self.poles = []  # List of complex numbers
         self.gain = 1.0
+        self.normalize_gain = True  # False keeps an explicitly designed gain, see update_from_zpk
         self.all_pass_filters = []  # List of all-pass filters
         self.all_pass_zeros = []
         self.all_pass_poles = []
@@ -18,17 +252,72 @@ class Filter:
         self.filters_dir.mkdir(exist_ok=True)
 
         self.subscribers = []  # Subscribers should include callback functions for: Magnitude plot, Phase plot, and elements list.
+        self.live_subscribers = []  # Cheap subscribers that are also notified with preview updates
+        self.async_subscribers = []  # (compute, apply, instance) for subscribers too slow for the GUI thread
+        self.dispatcher = None  # Runs async subscribers off the GUI thread when set
+        self.revision = 0  # Incremented on every notification
+
+        # LRU cache of computed responses, keyed on the filter state and the request parameters
+        self.response_cache_size = 32
+        self._response_cache = OrderedDict()
+        self._root_response = None  # Incrementally updated response used by the 'zpk' method
+        self.max_response_length = 1_000_000  # Cap on automatically sized impulse/step responses
+        self.unstable_response_length = 100  # Automatic length for responses that never decay
 
-    def subscribe(self, callback, instance):
+    def subscribe(self, callback, instance, live=False):
+        """Register a callback; live subscribers also receive preview updates sent during drags"""
         self.subscribers.append((callback, instance))
+        if live:
+            self.live_subscribers.append((callback, instance))
+
+    def subscribe_async(self, compute, apply, instance):
+        """Register an expensive subscriber split into compute(filter_snapshot) and apply(result).
 
-    def notify_subscribers(self, sender=None):
+        With a dispatcher set, compute runs on a worker thread against a snapshot of the filter
+        and apply receives its result on the GUI thread; without one both run synchronously.
+        """
+        self.async_subscribers.append((compute, apply, instance))
+
+    def set_dispatcher(self, dispatcher):
+        self.dispatcher = dispatcher
+
+    def notify_subscribers(self, sender=None, preview=False):
         self._normalize_gain()
-        for callback, instance in self.subscribers:
+        self.revision += 1
+        subscribers = self.live_subscribers if preview else self.subscribers
+        for callback, instance in subscribers:
             if sender is not instance:
                 callback(self)
 
-    def update_from_zplane(self, zeros, poles, all_pass_filters, sender):
+        if preview or not self.async_subscribers:
+            return
+        snapshot = self.snapshot()
+        for compute, apply, instance in self.async_subscribers:
+            if sender is instance:
+                continue
+            if self.dispatcher is not None:
+                self.dispatcher.submit(instance, self.revision, compute, apply, snapshot)
+            else:
+                apply(compute(snapshot))
+
+    def snapshot(self):
+        """Copy of the filter state without subscribers, safe to hand to another thread"""
+        snapshot = Filter.__new__(Filter)
+        snapshot.__dict__.update(self.__dict__)
+        snapshot.zeros = list(self.zeros)
+        snapshot.poles = list(self.poles)
+        snapshot.all_pass_filters = [dict(ap) for ap in self.all_pass_filters]
+        snapshot.all_pass_zeros = list(self.all_pass_zeros)
+        snapshot.all_pass_poles = list(self.all_pass_poles)
+        snapshot.subscribers = []
+        snapshot.live_subscribers = []
+        snapshot.async_subscribers = []
+        snapshot.dispatcher = None
+        snapshot._response_cache = OrderedDict()
+        snapshot._root_response = None
+        return snapshot
+
+    def update_from_zplane(self, zeros, poles, all_pass_filters, sender, preview=False):
         """Update filter coefficients from z-plane widget"""
         new_zeros = [complex(z.position.real, z.position.imag) for z in zeros]
         new_poles = [complex(p.position.real, p.position.imag) for p in poles]
@@ -53,9 +342,10 @@ class Filter:
 
         self.all_pass_filters = all_pass_filters
         self.parse_all_pass_filters()
+        self.invalidate_cache()
 
-        # Notify subscribers
-        self.notify_subscribers(sender)
+        # Notify subscribers (only the live ones while a drag is in progress)
+        self.notify_subscribers(sender, preview)
 
     def parse_all_pass_filters(self):
         self.all_pass_zeros = []
@@ -63,24 +353,45 @@ class Filter:
         for ap in self.all_pass_filters:
             a = ap["a"]
             angle = ap["theta"]
-            zero = 1 / a * np.exp(1j * angle)
-            pole = a * np.exp(1j * angle)
+            direction = np.exp(1j * angle)
+            if abs(direction.imag) < 1e-12:
+                # Sections at θ = 0 or π are real; e^jπ leaves a ~1e-16 imaginary part that
+                # would need a conjugate to be realizable
+                direction = complex(np.sign(direction.real))
+            zero = 1 / a * direction
+            pole = a * direction
             self.all_pass_zeros.append(zero)
             self.all_pass_poles.append(pole)
 
     def update_from_element_list(self, zeros, poles, sender):
         self.zeros = zeros
         self.poles = poles
+        self.invalidate_cache()
+        self.notify_subscribers(sender)
+
+    def update_from_zpk(self, zeros, poles, gain, sender=None):
+        """Replace the zeros, poles and gain, e.g. with a design from FilterDesign, and notify subscribers
+
+        The gain is kept as given rather than normalized, so the filter is exactly the design.
+        """
+        self.zeros = [complex(z) for z in zeros]
+        self.poles = [complex(p) for p in poles]
+        self.gain = float(np.real(gain))
+        self.normalize_gain = False
+        self.invalidate_cache()
         self.notify_subscribers(sender)
 
     def update_all_pass_filters(self, all_pass_filters, sender):
         """Update the list of all-pass filters and notify subscribers"""
         self.all_pass_filters = all_pass_filters
         self.parse_all_pass_filters()
+        self.invalidate_cache()
         self.notify_subscribers(sender)
 
     def _normalize_gain(self):
         """Normalize filter gain to 1 at DC (z = 1)"""
+        if not self.normalize_gain:
+            return
         if not self.zeros and not self.poles:
             self.gain = 1.0
             return
@@ -133,16 +444,83 @@ class Filter:
                 self.all_pass_poles.append(complex(p.real, -p.imag))
                 self.all_pass_zeros.append(complex(1 / p.real, -p.imag))
                 self.all_pass_filters.append({"coefficient": 1 / p.real, "theta": -p.imag})
+        self.invalidate_cache()
         self.notify_subscribers()
 
     def get_cascade_form(self):
-        """Get filter coefficients in cascade form"""
+        """Get filter coefficients in cascade form (second-order sections), all-pass filters included"""
         if not self.is_realizable():
             raise ValueError("Filter must have a conjugate pair for each complex element to convert to cascade form")
-        return signal.zpk2sos(self.zeros, self.poles, self.gain)
+        return signal.zpk2sos(self.zeros + self.all_pass_zeros, self.poles + self.all_pass_poles, self.gain)
+
+    def invalidate_cache(self):
+        """Drop all cached responses"""
+        self._response_cache.clear()
+
+    def _state_key(self):
+        """Hashable snapshot of everything the filter responses depend on"""
+        return (tuple(self.zeros), tuple(self.poles),
+                tuple(self.all_pass_zeros), tuple(self.all_pass_poles),
+                self.gain)
+
+    def _get_cached(self, key, compute):
+        """Return the cached result for key, computing and storing it on a miss"""
+        key = (self._state_key(),) + key
+        if key in self._response_cache:
+            self._response_cache.move_to_end(key)
+            return self._response_cache[key]
+
+        result = compute()
+        for array in result:
+            array.setflags(write=False)  # Cached arrays are shared between callers
+
+        self._response_cache[key] = result
+        if len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+        return result
 
-    def get_frequency_response(self, num_points=1024):
-        """Calculate frequency response"""
+    def get_frequency_response(self, num_points=1024, method='tf'):
+        """Calculate frequency response
+
+        method='tf' expands the roots into a transfer function and uses freqz,
+        method='zpk' evaluates the response directly from the roots, which is faster
+        and keeps its precision for high-order designs and clustered roots.
+        """
+        if method == 'tf':
+            compute = self._compute_frequency_response
+        elif method == 'zpk':
+            compute = self._compute_zpk_frequency_response
+        else:
+            raise ValueError(f"Unknown frequency response method: {method}")
+
+        return self._get_cached(('frequency', num_points, method), lambda: compute(num_points))
+
+    def get_group_delay(self, num_points=1024):
+        """Calculate group delay in samples, on the same frequency grid as get_frequency_response
+
+        It is evaluated analytically from the roots: each zero subtracts, and each pole adds,
+        the derivative of its angle to e^jw, so there is no numeric differentiation of the phase.
+        Frequencies that land on a zero or pole on the unit circle get a delay of 0.
+        """
+        return self._get_cached(('group_delay', num_points), lambda: self._compute_group_delay(num_points))
+
+    def _compute_group_delay(self, num_points):
+        w = np.linspace(0, np.pi, num_points, endpoint=False)
+        zeros = Counter(self.zeros + self.all_pass_zeros)
+        poles = Counter(self.poles + self.all_pass_poles)
+        # H(e^jw) = k * e^(jw(N - M)) * prod(e^jw - z) / prod(e^jw - p)
+        group_delay = np.full_like(w, sum(zeros.values()) - sum(poles.values()))
+
+        roots = list((zeros + poles).keys())
+        if roots:
+            delays, singular = _root_group_delays(roots, w)
+            weights = np.array([poles[root] - zeros[root] for root in roots])
+            group_delay += weights @ delays
+            group_delay[singular] = 0.0
+
+        return w, group_delay
+
+    def _compute_frequency_response(self, num_points):
         w, h = signal.freqz(*self.get_transfer_function(), worN=num_points)
 
         # frequencies = w * self.sample_rate / (2 * np.pi)
@@ -152,10 +530,64 @@ class Filter:
 
         return w, magnitude_db, phase_rad
 
-    def get_impulse_response(self, num_points=100):
-        """Calculate impulse response"""
+    def _compute_zpk_frequency_response(self, num_points):
+        # Only the roots that changed since the last call are re-evaluated
+        if self._root_response is None or self._root_response.num_points != num_points:
+            self._root_response = _RootResponse(num_points)
+        self._root_response.update(self.zeros + self.all_pass_zeros, self.poles + self.all_pass_poles)
+        return self._root_response.response(self.gain)
+
+    def get_impulse_response(self, num_points=None, decay_db=-80):
+        """Calculate impulse response
+
+        With num_points=None the length is chosen to let the response decay by decay_db
+        (see get_decay_length), capped at max_response_length. Unstable or marginally
+        stable filters never decay and get unstable_response_length samples instead.
+        """
+        num_points = self._response_length(num_points, decay_db)
+
+        def compute():
+            impulse = np.zeros(num_points)
+            impulse[0] = 1.0
+            return (self._filter_input(impulse),)
+
+        return self._get_cached(('impulse', num_points), compute)[0]
+
+    def get_step_response(self, num_points=None, decay_db=-80):
+        """Calculate step response, sized like get_impulse_response"""
+        num_points = self._response_length(num_points, decay_db)
+        return self._get_cached(('step', num_points),
+                                lambda: (self._filter_input(np.ones(num_points)),))[0]
+
+    def _response_length(self, num_points, decay_db):
+        if num_points is not None:
+            return num_points
+        try:
+            return min(self.get_decay_length(decay_db), self.max_response_length)
+        except ValueError:  # Unstable or marginally stable, it never decays
+            return self.unstable_response_length
+
+    def _filter_input(self, x):
+        if self.is_realizable():
+            return signal.sosfilt(self.get_cascade_form(), x)
         b, a = self.get_transfer_function()
-        return signal.lfilter(b, a, [1.0] + [0.0] * (num_points - 1))
+        return signal.lfilter(b, a, x)
+
+    def get_decay_length(self, decay_db=-80):
+        """Estimate how many samples the impulse response takes to decay by decay_db
+
+        The envelope of an IIR response shrinks by the largest pole radius per sample;
+        an FIR response (all poles at the origin) ends after its taps.
+        """
+        poles = np.asarray(self.poles + self.all_pass_poles, dtype=complex)
+        order = max(len(self.zeros) + len(self.all_pass_zeros), len(poles))
+        radius = np.max(np.abs(poles)) if len(poles) else 0.0
+        if radius >= 1:
+            raise ValueError("Filter is not stable, its impulse response does not decay")
+        if radius < 1e-12:
+            return order + 1
+
+        return order + 1 + int(np.ceil(decay_db / (20 * np.log10(radius))))
 
     def save_to_file(self, filename):
         """Save filter to JSON file"""
@@ -163,7 +595,8 @@ class Filter:
             'zeros': [(z.real, z.imag) for z in self.zeros],
             'poles': [(p.real, p.imag) for p in self.poles],
             'all_pass_filters': self.all_pass_filters,
-            'gain': self.gain
+            'gain': self.gain,
+            'normalize_gain': self.normalize_gain
         }
 
         with open(filename, 'w') as f:
@@ -178,5 +611,26 @@ class Filter:
         self.poles = [complex(p[0], p[1]) for p in data['poles']]
         self.all_pass_filters = data['all_pass_filters']
         self.gain = data['gain']
+        self.normalize_gain = data.get('normalize_gain', True)
         self.parse_all_pass_filters()
+        self.invalidate_cache()
         self.notify_subscribers()
+
+
+if __name__ == '__main__':
+    # Regression check: moving a zero off z = 1 (a grid frequency) must not leave NaN in the
+    # incrementally updated 'zpk' response
+    check_filter = Filter()
+    check_zeros, check_poles, check_gain = signal.butter(4, 0.3, btype='highpass', output='zpk')
+    check_filter.update_from_zpk(check_zeros, check_poles, check_gain)
+    check_filter.get_frequency_response(method='zpk')
+    check_filter.update_from_element_list([0.9 + 0j] + check_filter.zeros[1:], check_filter.poles, None)
+
+    _, zpk_magnitude, zpk_phase = check_filter.get_frequency_response(method='zpk')
+    _, tf_magnitude, tf_phase = check_filter.get_frequency_response(method='tf')
+    assert np.all(np.isfinite(zpk_magnitude)) and np.all(np.isfinite(zpk_phase))
+    # Away from the remaining zeros at DC, where the phase is undefined and freqz rounds off
+    defined = tf_magnitude > -200
+    assert np.allclose(zpk_magnitude[defined], tf_magnitude[defined], atol=1e-6)
+    assert np.allclose(np.exp(1j * zpk_phase[defined]), np.exp(1j * tf_phase[defined]), atol=1e-6)
+    print("zpk response matches tf after moving a root off z = 1")
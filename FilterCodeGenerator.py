@@ -1,7 +1,13 @@
 from datetime import datetime
 
+import numpy as np
+
 
 class FilterCodeGenerator:
+    # 'direct' emits one high-order Direct Form II loop; the cascade structures emit
+    # one biquad per second-order section, in Direct Form I or transposed Direct Form II
+    STRUCTURES = ('direct', 'cascade_df1', 'cascade_df2t')
+
     def __init__(self, filter):
         self.header_template = """
 /* Auto-generated filter implementation
@@ -12,6 +18,7 @@ class FilterCodeGenerator:
 #ifndef {header_guard}
 #define {header_guard}
 
+#include <stddef.h>
 #include <stdint.h>
 
 {struct_definitions}
@@ -29,11 +36,16 @@ class FilterCodeGenerator:
         self.source_path = None
         self.filter = filter
 
-    def export_c_code(self, file_path, name="filter"):
+    def export_c_code(self, file_path, name="filter", structure="direct"):
+        if structure not in self.STRUCTURES:
+            raise ValueError(f"Unknown filter structure '{structure}', expected one of {self.STRUCTURES}")
         base_name = file_path.rsplit('.', 1)[0]
         base_filename = base_name.split('/')[-1]
 
-        code_parts = self._generate_code_parts(name)
+        if structure == 'direct':
+            code_parts = self._generate_code_parts(name)
+        else:
+            code_parts = self._generate_cascade_code_parts(name, transposed=structure == 'cascade_df2t')
         header_content, source_content = self._get_files_content(
             code_parts,
             datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -47,67 +59,241 @@ class FilterCodeGenerator:
 
     def _generate_code_parts(self, name):
         tf = self.filter.get_transfer_function(self)
-        denominator_coeffs = tf[1]
-        numerator_coeffs = tf[0]
-        order = max(len(denominator_coeffs), len(numerator_coeffs)) - 1
+        order = max(len(tf[0]), len(tf[1])) - 1
+        # Pad both polynomials to order + 1 and normalize by a0 so the loops can skip it
+        numerator_coeffs = np.pad(tf[0], (0, order + 1 - len(tf[0]))) / tf[1][0]
+        denominator_coeffs = np.pad(tf[1], (0, order + 1 - len(tf[1]))) / tf[1][0]
+        if order == 0:
+            # Zero-length arrays aren't valid C, and a pure gain needs no delay line
+            return self._generate_gain_code_parts(name, numerator_coeffs[0])
 
-        # Generate structure definition
+        # The delay line is a circular buffer stored twice, so the {order} values
+        # starting at head are always contiguous and no per-sample shift is needed
         struct_def = f"""
 typedef struct {{
-    float state[{order}];  // Delay line
-    float output;          // Latest output
+    float state[{2 * order}];  // Delay line, newest value at state[head], mirrored at state[head + {order}]
+    int head;         // Index of the newest delay line value
+    float output;     // Latest output
 }} {name}_filter_t;
 """
 
         # Generate initialization function
         init_func = f"""
 void {name}_init({name}_filter_t* f) {{
-    for(int i = 0; i < {order}; i++) {{
+    for(int i = 0; i < {2 * order}; i++) {{
         f->state[i] = 0.0f;
     }}
+    f->head = 0;
     f->output = 0.0f;
 }}
 """
 
         # Generate coefficient arrays
+        coeff_arrays = f"""
+// Filter coefficients, contiguous so the inner loops vectorize
+static const float {name}_num[{order + 1}] = {{{', '.join(f"{float(x)!r}f" for x in numerator_coeffs)}}};
+static const float {name}_den[{order}] = {{{', '.join(f"{float(x)!r}f" for x in denominator_coeffs[1:])}}};  // Skip a0
+"""
+
+        # Generate processing functions; the single-sample call is a block of one
+        process_func = f"""
+void {name}_process_block({name}_filter_t* f, const float* in, float* out, size_t n) {{
+    float* state = f->state;
+    int head = f->head;
+
+    for(size_t k = 0; k < n; k++) {{
+        const float* delay = state + head;
+        float new_state = in[k];
+        float output = 0.0f;
+
+        // Apply feedback and feedforward taps over the contiguous delay line
+        for(int i = 0; i < {order}; i++) {{
+            new_state -= {name}_den[i] * delay[i];
+            output += {name}_num[i + 1] * delay[i];
+        }}
+        output += {name}_num[0] * new_state;
+
+        // Push the new state by moving the head back instead of shifting
+        head = (head == 0) ? {order - 1} : head - 1;
+        state[head] = new_state;
+        state[head + {order}] = new_state;
+        out[k] = output;
+    }}
+
+    f->head = head;
+    if(n > 0) {{
+        f->output = out[n - 1];
+    }}
+}}
+
+float {name}_process({name}_filter_t* f, float input) {{
+    float output;
+    {name}_process_block(f, &input, &output, 1);
+    return output;
+}}
+"""
+
+        return {
+            'order': order,
+            'struct_definitions': struct_def,
+            'function_declarations': f"""
+void {name}_init({name}_filter_t* f);
+float {name}_process({name}_filter_t* f, float input);
+void {name}_process_block({name}_filter_t* f, const float* in, float* out, size_t n);
+""",
+            'function_definitions': coeff_arrays + init_func + process_func
+        }
+
+    def _generate_gain_code_parts(self, name, gain):
+        """Generate the direct form of an order-0 filter, a plain gain"""
+        struct_def = f"""
+typedef struct {{
+    float output;  // Latest output
+}} {name}_filter_t;
+"""
+
+        init_func = f"""
+void {name}_init({name}_filter_t* f) {{
+    f->output = 0.0f;
+}}
+"""
+
         coeff_arrays = f"""
 // Filter coefficients
-static const float {name}_num[] = {{{', '.join([f"{x}f" for x in numerator_coeffs])}}};
-static const float {name}_den[] = {{{', '.join([f"{x}f" for x in denominator_coeffs[1:]])}}};  // Skip a0
+static const float {name}_num[1] = {{{float(gain)!r}f}};
 """
 
-        # Generate processing function
         process_func = f"""
+void {name}_process_block({name}_filter_t* f, const float* in, float* out, size_t n) {{
+    for(size_t k = 0; k < n; k++) {{
+        out[k] = {name}_num[0] * in[k];
+    }}
+
+    if(n > 0) {{
+        f->output = out[n - 1];
+    }}
+}}
+
 float {name}_process({name}_filter_t* f, float input) {{
-    float new_state = input;
+    float output;
+    {name}_process_block(f, &input, &output, 1);
+    return output;
+}}
+"""
+
+        return {
+            'order': 0,
+            'struct_definitions': struct_def,
+            'function_declarations': f"""
+void {name}_init({name}_filter_t* f);
+float {name}_process({name}_filter_t* f, float input);
+void {name}_process_block({name}_filter_t* f, const float* in, float* out, size_t n);
+""",
+            'function_definitions': coeff_arrays + init_func + process_func
+        }
+
+    def _generate_cascade_code_parts(self, name, transposed=False):
+        """Generate a cascade of biquads from the second-order sections, all-pass sections included
+
+        Direct Form I keeps the last two inputs and outputs of each section; transposed
+        Direct Form II keeps two accumulators, which halves the state and suits float.
+        """
+        sos = self.filter.get_cascade_form()
+        # Normalize each section by a0 so the loops can skip it
+        sos = sos / sos[:, 3:4]
+        n_sections = len(sos)
+        # Odd orders pad one section, so count the roots rather than 2 * n_sections
+        order = max(len(self.filter.zeros) + len(self.filter.all_pass_zeros),
+                    len(self.filter.poles) + len(self.filter.all_pass_poles))
+        state_size = 2 if transposed else 4
+        form_name = "transposed Direct Form II" if transposed else "Direct Form I"
+
+        struct_def = f"""
+#define {name.upper()}_NUM_SECTIONS {n_sections}
+
+typedef struct {{
+    float state[{n_sections}][{state_size}];  // Per-section state ({"s1, s2" if transposed else "x[n-1], x[n-2], y[n-1], y[n-2]"})
+    float output;  // Latest output
+}} {name}_filter_t;
+"""
 
-    // Apply feedback
-    for(int i = 0; i < {order}; i++) {{
-        new_state -= {name}_den[i] * f->state[i];
+        init_func = f"""
+void {name}_init({name}_filter_t* f) {{
+    for(int s = 0; s < {n_sections}; s++) {{
+        for(int i = 0; i < {state_size}; i++) {{
+            f->state[s][i] = 0.0f;
+        }}
     }}
+    f->output = 0.0f;
+}}
+"""
 
-    // Calculate output
-    float output = {name}_num[0] * new_state;
-    for(int i = 0; i < {order}; i++) {{
-        output += {name}_num[i + 1] * f->state[i];
+        rows = ",\n".join("    {" + ", ".join(f"{float(x)!r}f" for x in (b0, b1, b2, a1, a2)) + "}"
+                           for b0, b1, b2, _, a1, a2 in sos)
+        coeff_arrays = f"""
+// Second-order sections {{b0, b1, b2, a1, a2}}, normalized so a0 = 1
+static const float {name}_sos[{n_sections}][5] = {{
+{rows}
+}};
+"""
+
+        if transposed:
+            load_state = "float s1 = z[0], s2 = z[1];"
+            section_body = """float y = b0 * x + s1;
+            s1 = b1 * x - a1 * y + s2;
+            s2 = b2 * x - a2 * y;"""
+            store_state = "z[0] = s1;\n        z[1] = s2;"
+        else:
+            load_state = "float x1 = z[0], x2 = z[1], y1 = z[2], y2 = z[3];"
+            section_body = """float y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2;
+            x2 = x1;
+            x1 = x;
+            y2 = y1;
+            y1 = y;"""
+            store_state = "z[0] = x1;\n        z[1] = x2;\n        z[2] = y1;\n        z[3] = y2;"
+
+        # Sections run one after another over the whole block, keeping each section's
+        # coefficients and state in locals; the single-sample call is a block of one
+        process_func = f"""
+// Cascade of biquads in {form_name}
+void {name}_process_block({name}_filter_t* f, const float* in, float* out, size_t n) {{
+    if(n == 0) {{
+        return;
     }}
 
-    // Update state
-    for(int i = {order - 1}; i > 0; i--) {{
-        f->state[i] = f->state[i-1];
+    const float* src = in;
+    for(int s = 0; s < {n_sections}; s++) {{
+        const float* c = {name}_sos[s];
+        const float b0 = c[0], b1 = c[1], b2 = c[2], a1 = c[3], a2 = c[4];
+        float* z = f->state[s];
+        {load_state}
+
+        for(size_t k = 0; k < n; k++) {{
+            float x = src[k];
+            {section_body}
+            out[k] = y;
+        }}
+
+        {store_state}
+        src = out;  // Later sections filter the output in place
     }}
-    f->state[0] = new_state;
-    f->output = output;
+    f->output = out[n - 1];
+}}
 
+float {name}_process({name}_filter_t* f, float input) {{
+    float output;
+    {name}_process_block(f, &input, &output, 1);
     return output;
 }}
 """
 
         return {
+            'order': order,
             'struct_definitions': struct_def,
             'function_declarations': f"""
 void {name}_init({name}_filter_t* f);
 float {name}_process({name}_filter_t* f, float input);
+void {name}_process_block({name}_filter_t* f, const float* in, float* out, size_t n);
 """,
             'function_definitions': coeff_arrays + init_func + process_func
         }
@@ -129,7 +315,7 @@ float {name}_process({name}_filter_t* f, float input);
 
         header_content = self.header_template.format(
             timestamp=timestamp,
-            order="N/A",
+            order=code_parts.get('order', "N/A"),
             header_guard=header_guard,
             struct_definitions=code_parts['struct_definitions'],
             function_declarations=code_parts['function_declarations']
@@ -149,80 +335,3 @@ float {name}_process({name}_filter_t* f, float input);
 
         with open(self.source_path, "w") as f:
             f.write(source)
-
-#     def generate_cascade_form(self, name, sections):
-#         """Generate C code for Cascade Form implementation"""
-#         total_sections = len(sections)
-#         max_order = max(max(len(d), len(n)) - 1 for d, n in sections)
-#
-#         # Generate structure definition
-#         struct_def = f"""
-# typedef struct {{
-#     float state[{total_sections}][{max_order}];  // State for each section
-#     float output;                                // Latest output
-# }} {name}_filter_t;
-# """
-#
-#         # Generate initialization function
-#         init_func = f"""
-# void {name}_init({name}_filter_t* f) {{
-#     for(int s = 0; s < {total_sections}; s++) {{
-#         for(int i = 0; i < {max_order}; i++) {{
-#             f->state[s][i] = 0.0f;
-#         }}
-#     }}
-#     f->output = 0.0f;
-# }}
-# """
-#
-#         # Generate coefficient arrays for each section
-#         coeff_arrays = []
-#         for i, (deno, num) in enumerate(sections):
-#             coeff_arrays.extend([
-#                 f"static const float {name}_num{i}[] = {{{', '.join([f'{x}f' for x in num])}}};"
-#                 f"static const float {name}_den{i}[] = {{{', '.join([f'{x}f' for x in deno[1:]])}}};"
-#             ])
-#         coeff_arrays = "\n".join(coeff_arrays)
-#
-#         # Generate processing function
-#         process_sections = []
-#         for i, (deno, num) in enumerate(sections):
-#             order = max(len(deno), len(num)) - 1
-#             section = f"""
-#     // Section {i}
-#     float new_state{i} = section_input;
-#     for(int i = 0; i < {order}; i++) {{
-#         new_state{i} -= {name}_den{i}[i] * f->state[{i}][i];
-#     }}
-#
-#     section_input = {name}_num{i}[0] * new_state{i};
-#     for(int i = 0; i < {order}; i++) {{
-#         section_input += {name}_num{i}[i + 1] * f->state[{i}][i];
-#     }}
-#
-#     for(int i = {order - 1}; i > 0; i--) {{
-#         f->state[{i}][i] = f->state[{i}][i-1];
-#     }}
-#     f->state[{i}][0] = new_state{i};
-# """
-#             process_sections.append(section)
-#
-#         process_func = f"""
-# float {name}_process({name}_filter_t* f, float input) {{
-#     float section_input = input;
-#
-#     {' '.join(process_sections)}
-#
-#     f->output = section_input;
-#     return f->output;
-# }}
-# """
-#
-#         return {
-#             'struct_definitions': struct_def,
-#             'function_declarations': f"""
-# void {name}_init({name}_filter_t* f);
-# float {name}_process({name}_filter_t* f, float input);
-# """,
-#             'function_definitions': coeff_arrays + init_func + process_func
-#         }
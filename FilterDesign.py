@@ -0,0 +1,300 @@
+"""
+Headless design of the classic filter families, and sweeps over grids of design parameters.
+
+Frequencies are normalized to Nyquist (0 to 1), as in scipy.signal. Designs are plain dicts
+{"family", "response", "order", "cutoff", "ripple", "attenuation"} so that they can be cached
+on disk as JSON; cutoff is a single edge for 'lpf'/'hpf' and a (low, high) pair for 'bpf'/'bsf'.
+"""
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from scipy import signal
+
+from Filter import batch_frequency_response
+from logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+FAMILIES = ('butterworth', 'chebyshev', 'inverse_chebyshev', 'bessel', 'elliptic')
+RESPONSES = {'lpf': 'lowpass', 'hpf': 'highpass', 'bpf': 'bandpass', 'bsf': 'bandstop'}
+SPEC_TOLERANCE_DB = 1e-6  # Designs that hit a ripple or attenuation target exactly land within rounding of it
+
+# Parameters each family's design depends on, besides order and cutoff
+FAMILY_PARAMETERS = {
+    'butterworth': (),
+    'chebyshev': ('ripple',),
+    'inverse_chebyshev': ('attenuation',),
+    'bessel': (),
+    'elliptic': ('ripple', 'attenuation'),
+}
+
+
+def design_filter(family, response='lpf', order=4, cutoff=0.5, ripple=1.0, attenuation=40.0):
+    """
+    Design a digital filter and return its (zeros, poles, gain).
+
+    ripple is the passband ripple in dB (Chebyshev, elliptic), attenuation the stopband
+    attenuation in dB (inverse Chebyshev, elliptic). Bessel cutoffs are -3 dB points.
+    """
+    if response not in RESPONSES:
+        raise ValueError(f"Unknown filter response: {response}")
+    btype = RESPONSES[response]
+
+    if family == 'butterworth':
+        return signal.butter(order, cutoff, btype, output='zpk')
+    if family == 'chebyshev':
+        return signal.cheby1(order, ripple, cutoff, btype, output='zpk')
+    if family == 'inverse_chebyshev':
+        return signal.cheby2(order, attenuation, cutoff, btype, output='zpk')
+    if family == 'bessel':
+        return signal.bessel(order, cutoff, btype, output='zpk', norm='mag')
+    if family == 'elliptic':
+        return signal.ellip(order, ripple, attenuation, cutoff, btype, output='zpk')
+    raise ValueError(f"Unknown filter family: {family}")
+
+
+def design_grid(families=FAMILIES, responses=('lpf',), orders=range(1, 11), cutoffs=(0.5,),
+                ripples=(1.0,), attenuations=(40.0,)):
+    """
+    All combinations of the given parameters as design dicts.
+
+    Ripple and attenuation are only varied for the families that use them, so e.g.
+    a Butterworth design is not repeated once per ripple value.
+    """
+    designs = []
+    seen = set()
+    for family, response, order, cutoff, ripple, attenuation in itertools.product(
+            families, responses, orders, cutoffs, ripples, attenuations):
+        design = {'family': family, 'response': response, 'order': int(order),
+                  'cutoff': cutoff if np.isscalar(cutoff) else list(cutoff),
+                  'ripple': ripple if 'ripple' in FAMILY_PARAMETERS[family] else None,
+                  'attenuation': attenuation if 'attenuation' in FAMILY_PARAMETERS[family] else None}
+        key = design_key(design)
+        if key not in seen:
+            seen.add(key)
+            designs.append(design)
+    return designs
+
+
+def design_key(design):
+    return json.dumps(design, sort_keys=True)
+
+
+def _zpk_of(design):
+    parameters = {name: value for name, value in design.items() if value is not None}
+    return design_filter(**parameters)
+
+
+def _band_masks(f, response, passband, stopband):
+    """Passband and stopband masks over normalized frequencies f"""
+    if response == 'lpf':
+        return f <= passband, f >= stopband
+    if response == 'hpf':
+        return f >= passband, f <= stopband
+    if response == 'bpf':
+        return (f >= passband[0]) & (f <= passband[1]), (f <= stopband[0]) | (f >= stopband[1])
+    if response == 'bsf':
+        return (f <= passband[0]) | (f >= passband[1]), (f >= stopband[0]) & (f <= stopband[1])
+    raise ValueError(f"Unknown filter response: {response}")
+
+
+def measure_designs(designs, spec, num_points=4096):
+    """
+    Measure designs against a spec, evaluating all their responses in one batch.
+
+    spec is a dict with 'passband' and 'stopband' edges (normalized, pairs for 'bpf'/'bsf'),
+    'max_ripple' and 'min_attenuation' in dB. Each design gets:
+      passband_ripple       peak-to-peak magnitude over the passband, dB
+      stopband_attenuation  passband peak minus the highest stopband level, dB
+      transition_width      total normalized width of the frequencies that are neither within
+                            max_ripple of the passband peak nor min_attenuation below it
+      meets_spec            ripple and attenuation are both within the spec, up to SPEC_TOLERANCE_DB
+    """
+    if not designs:
+        return []
+    w, magnitude_db, _ = batch_frequency_response([_zpk_of(design) for design in designs], num_points)
+    f = w / np.pi
+    bin_width = 1.0 / num_points
+
+    metrics = []
+    for design, magnitude in zip(designs, magnitude_db):
+        passband, stopband = _band_masks(f, design['response'], spec['passband'], spec['stopband'])
+        peak = np.max(magnitude[passband])
+        ripple = peak - np.min(magnitude[passband])
+        attenuation = peak - np.max(magnitude[stopband])
+        in_transition = (magnitude < peak - spec['max_ripple']) & (magnitude > peak - spec['min_attenuation'])
+
+        metrics.append({
+            'passband_ripple': float(ripple),
+            'stopband_attenuation': float(attenuation),
+            'transition_width': float(np.count_nonzero(in_transition) * bin_width),
+            'meets_spec': bool(ripple <= spec['max_ripple'] + SPEC_TOLERANCE_DB and
+                               attenuation >= spec['min_attenuation'] - SPEC_TOLERANCE_DB),
+        })
+    return metrics
+
+
+def _cache_path(cache_dir, spec, num_points):
+    spec_key = json.dumps({'spec': spec, 'num_points': num_points}, sort_keys=True)
+    return Path(cache_dir) / f"design_sweep_{hashlib.sha1(spec_key.encode()).hexdigest()[:16]}.json"
+
+
+def sweep(designs, spec, workers=None, cache_dir=None, chunk_size=256, num_points=4096):
+    """
+    Measure every design against spec, in parallel, and return the designs merged with their metrics.
+
+    Chunks of designs are measured in a process pool (workers=1 measures in this process).
+    With a cache_dir, metrics are kept in one JSON file per spec, so repeated or overlapping
+    sweeps only evaluate new designs.
+    """
+    start_time = time.perf_counter()
+    cache = {}
+    cache_path = _cache_path(cache_dir, spec, num_points) if cache_dir is not None else None
+    if cache_path is not None and cache_path.is_file():
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+
+    pending = [design for design in designs if design_key(design) not in cache]
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            chunk_metrics = list(executor.map(measure_designs, chunks, [spec] * len(chunks),
+                                              [num_points] * len(chunks)))
+    else:
+        chunk_metrics = [measure_designs(chunk, spec, num_points) for chunk in chunks]
+
+    for chunk, metrics in zip(chunks, chunk_metrics):
+        for design, design_metrics in zip(chunk, metrics):
+            cache[design_key(design)] = design_metrics
+
+    if cache_path is not None and pending:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = cache_path.with_suffix('.tmp')
+        with open(temporary_path, 'w') as f:
+            json.dump(cache, f)
+        os.replace(temporary_path, cache_path)  # Never leave a half-written cache behind
+
+    logger.info(f'Measured {len(designs)} designs ({len(pending)} new) in '
+                f'{time.perf_counter() - start_time:.2f} s')
+    return [{**design, **cache[design_key(design)]} for design in designs]
+
+
+def cheapest_design(results):
+    """The lowest-order result that meets the spec, preferring more attenuation; None if none does"""
+    passing = [result for result in results if result['meets_spec']]
+    if not passing:
+        return None
+    return min(passing, key=lambda result: (result['order'], -result['stopband_attenuation']))
+
+
+# scipy's minimum-order estimators; Bessel has none and is searched order by order
+ORDER_ESTIMATORS = {
+    'butterworth': signal.buttord,
+    'chebyshev': signal.cheb1ord,
+    'inverse_chebyshev': signal.cheb2ord,
+    'elliptic': signal.ellipord,
+}
+
+
+def spec_response(spec):
+    """The response type ('lpf', 'hpf', 'bpf' or 'bsf') implied by a spec's band edges"""
+    passband, stopband = spec['passband'], spec['stopband']
+    if np.isscalar(passband):
+        return 'lpf' if passband < stopband else 'hpf'
+    return 'bpf' if stopband[0] < passband[0] else 'bsf'
+
+
+def _cutoff_candidates(spec, n_candidates):
+    """Cutoffs moved from the passband edges (t = 0) towards the stopband edges (t = 1)"""
+    passband, stopband = np.atleast_1d(spec['passband']), np.atleast_1d(spec['stopband'])
+    cutoffs = []
+    for t in np.linspace(0, 1, n_candidates):
+        cutoff = passband + t * (stopband - passband)
+        cutoffs.append(float(cutoff[0]) if len(cutoff) == 1 else cutoff.tolist())
+    return cutoffs
+
+
+def _design_with_order(family, response, order, cutoff, spec):
+    return {'family': family, 'response': response, 'order': int(order), 'cutoff': cutoff,
+            'ripple': spec['max_ripple'] if 'ripple' in FAMILY_PARAMETERS[family] else None,
+            'attenuation': spec['min_attenuation'] if 'attenuation' in FAMILY_PARAMETERS[family] else None}
+
+
+def _best_passing_design(family, order, spec, estimated_cutoff, num_points, n_candidates):
+    """The passing design of this order with the most attenuation, or None"""
+    response = spec_response(spec)
+    if estimated_cutoff is not None:
+        design = _design_with_order(family, response, order, estimated_cutoff, spec)
+        metrics, = measure_designs([design], spec, num_points)
+        if metrics['meets_spec']:
+            return {**design, **metrics}
+
+    designs = [_design_with_order(family, response, order, cutoff, spec)
+               for cutoff in _cutoff_candidates(spec, n_candidates)]
+    metrics = measure_designs(designs, spec, num_points)
+    passing = [{**design, **design_metrics} for design, design_metrics in zip(designs, metrics)
+               if design_metrics['meets_spec']]
+    return max(passing, key=lambda result: result['stopband_attenuation']) if passing else None
+
+
+def minimum_order_design(family, spec, max_order=40, num_points=8192, n_candidates=33):
+    """
+    Find the lowest-order design of a family that meets spec, or None if max_order doesn't suffice.
+
+    The search starts at scipy's order estimate (order 1 for Bessel), doubles the order until
+    a design passes and then bisects down to the lowest passing order. Each order is verified on
+    a dense grid with measure_designs, first with the estimator's cutoff and then with cutoffs
+    swept from the passband towards the stopband edges, all measured in one batch.
+    Returns the design dict merged with its metrics.
+    """
+    order = 1
+    estimated_cutoff = None
+    if family in ORDER_ESTIMATORS:
+        order, estimated_cutoff = ORDER_ESTIMATORS[family](spec['passband'], spec['stopband'],
+                                                           spec['max_ripple'], spec['min_attenuation'])
+        estimated_cutoff = np.atleast_1d(estimated_cutoff).tolist()
+        if len(estimated_cutoff) == 1:
+            estimated_cutoff = estimated_cutoff[0]
+
+    def check(order):
+        # The estimator's cutoff is only meaningful for the order it was computed for
+        cutoff = estimated_cutoff if order == first_order else None
+        return _best_passing_design(family, order, spec, cutoff, num_points, n_candidates)
+
+    first_order = low = min(max(int(order), 1), max_order)
+    best = check(low)
+    if best is not None:
+        return best
+
+    # Gallop up to a passing order, then bisect between the last failure and it
+    high = low
+    while best is None and high < max_order:
+        low, high = high, min(2 * high, max_order)
+        best = check(high)
+    if best is None:
+        return None
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        result = check(middle)
+        if result is None:
+            low = middle
+        else:
+            high, best = middle, result
+    return best
+
+
+def minimum_order_designs(spec, families=FAMILIES, max_order=40, num_points=8192):
+    """Minimum-order design of each family for spec, as {family: result or None}"""
+    start_time = time.perf_counter()
+    results = {family: minimum_order_design(family, spec, max_order, num_points) for family in families}
+    logger.info(f'Found minimum-order designs for {len(families)} families in '
+                f'{time.perf_counter() - start_time:.2f} s')
+    return results
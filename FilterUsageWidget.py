@@ -1,7 +1,7 @@
 from PySide6 import QtCore, QtWidgets
 import pyqtgraph as pg
 import numpy as np
-from Signal import DigitalSignal
+from Signal import DigitalSignal, SampleRingBuffer, StreamingFilter
 from Filter import Filter
 
 
@@ -59,8 +59,14 @@ class FilterUsageWidget(QtWidgets.QWidget):
         self.real_time_mode = False
         self.speed = 10
         self.buffer_size = 1000
-        self.signal_buffer = np.zeros(self.buffer_size)
-        self.filtered_buffer = np.zeros(self.buffer_size)
+        # Real-time input and its filtered output; each new sample is filtered once by
+        # the streaming filter, which carries the delay-line state between samples
+        self.signal_buffer = SampleRingBuffer(self.buffer_size)
+        self.filtered_buffer = SampleRingBuffer(self.buffer_size)
+        self.stream = None
+        self.inputCurve = None
+        self.filteredCurve = None
+        self.filtered_signal = None  # Filtered copy of the loaded signal, recomputed on filter changes
         
         # Modified time array initialization
         self.base_sampling_rate = 1000  # Base rate in Hz
@@ -90,20 +96,31 @@ class FilterUsageWidget(QtWidgets.QWidget):
         self.mousePad.setVisible(checked)
         self.browseButton.setEnabled(not checked)
         if checked:
-            self.signal_buffer = np.zeros(self.buffer_size)
-            self.filtered_buffer = np.zeros(self.buffer_size)
+            self.signal_buffer.clear()
+            self.filtered_buffer.clear()
+            self.resetStream()
+
+            # Persistent plot items, updated in place with setData
+            self.inputPlot.clear()
+            self.filteredPlot.clear()
+            self.inputCurve = self.inputPlot.plot()
+            self.filteredCurve = self.filteredPlot.plot()
+
             self.timer.timeout.disconnect()  
             self.timer.timeout.connect(self.updateRealTime)
         else:
             self.timer.timeout.disconnect()
             self.timer.timeout.connect(self.updateView)
+            self.refilter()
         
 
     def browseFile(self):
-        filename, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Open Signal", "", "CSV files (*.csv)")
+        filename, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Open Signal", "", "Signal files (*.csv *.dsig *.npy);;CSV files (*.csv);;All Files (*.*)")
         if filename:
-            self.signal = DigitalSignal.convert_to_numpy(filename)
-            self.updatePlots()
+            self.signal = DigitalSignal.load(filename)
+            self.filtered_signal = None
+            self.refilter()
 
     def updateSpeed(self, value):
         self.speed = value
@@ -130,10 +147,25 @@ class FilterUsageWidget(QtWidgets.QWidget):
 
     def mouseMoveEvent(self, event):
         if self.real_time_mode and self.playing:
-            self.signal_buffer = np.roll(self.signal_buffer, -1)
-            self.signal_buffer[-1] = event.x()
-            
-            self.updateRealTime()
+            # Plots are refreshed by the timer, so input events only cost the filtering
+            self.pushSamples(event.x())
+
+    def pushSamples(self, samples):
+        """Append real-time input samples and filter them, O(order) per sample"""
+        samples = np.atleast_1d(np.asarray(samples, dtype=float))
+        self.signal_buffer.push(samples)
+        if self.stream is not None:
+            self.filtered_buffer.push(self.stream.process(samples))
+        else:
+            self.filtered_buffer.push(np.zeros(len(samples)))
+
+    def resetStream(self):
+        """Restart the streaming filter and re-filter the buffered input with it"""
+        if not hasattr(self, 'filter'):
+            self.stream = None
+            return
+        self.stream = StreamingFilter(self.filter, self.base_sampling_rate)
+        self.filtered_buffer.push(self.stream.process(self.signal_buffer.view()))
 
     def updateView(self):
         if not self.real_time_mode and self.playing and hasattr(self, 'signal'):
@@ -152,22 +184,11 @@ class FilterUsageWidget(QtWidgets.QWidget):
                                     end/self.signal.sampling_rate)
             self.filteredPlot.setXRange(start/self.signal.sampling_rate, 
                                     end/self.signal.sampling_rate)
-            
-            self.updatePlots()
 
     def updateRealTime(self):
         if self.real_time_mode and self.playing:
-            self.inputPlot.clear()
-            self.filteredPlot.clear()
-            
             # Plot with updated time array
-            self.inputPlot.plot(self.time_array, self.signal_buffer)
-            
-            if hasattr(self, 'filter'):
-                real_time_signal = DigitalSignal(self.signal_buffer, 
-                                               int(1/self.temporal_resolution))
-                filtered_data = real_time_signal.apply_filter(self.filter).data
-                self.filteredPlot.plot(self.time_array, filtered_data)
+            self.updatePlots()
             
             # Update x-axis range to show full buffer
             total_time = self.buffer_size * self.temporal_resolution
@@ -182,25 +203,48 @@ class FilterUsageWidget(QtWidgets.QWidget):
                 self.zoom_level = min(1.0, self.zoom_level + 0.1)
             self.updateView()
 
-    def updatePlots(self, filter_instance=None):
-        if filter_instance is not None:
-            self.filter = filter_instance
+    def filterSignal(self, filter_snapshot):
+        """Filter the current input; runs on a worker thread when the filter has a dispatcher"""
         if self.real_time_mode:
-            self.inputPlot.clear()
-            self.filteredPlot.clear()
-            self.inputPlot.plot(self.time_array, self.signal_buffer)
+            return True, None  # The streaming filter is rebuilt on the GUI thread, see showFilteredSignal
+        if hasattr(self, 'signal'):
+            return False, self.signal.apply_filter(filter_snapshot)
+        return False, None
+
+    def refilter(self):
+        """Filter the current input on the GUI thread and redraw"""
+        if hasattr(self, 'filter'):
+            self.showFilteredSignal(self.filterSignal(self.filter))
+        else:
+            self.updatePlots()
+
+    def showFilteredSignal(self, result):
+        """Receive a filtered signal on the GUI thread and redraw"""
+        real_time_mode, filtered_signal = result
+        if real_time_mode != self.real_time_mode:
+            return  # Mode changed while filtering, the result no longer matches the input
+
+        if real_time_mode:
+            # Rebuilding here keeps the stream in step with samples pushed meanwhile
+            self.resetStream()
+        else:
+            self.filtered_signal = filtered_signal
+        self.updatePlots()
+
+    def updatePlots(self):
+        if self.real_time_mode:
+            # Copy the windows: pyqtgraph keeps the arrays, and the ring moves on underneath them
+            self.inputCurve.setData(self.time_array, self.signal_buffer.view().copy())
             if hasattr(self, 'filter'):
-                filtered_signal = DigitalSignal(self.signal_buffer, 1000)
-                self.filtered_buffer = filtered_signal.apply_filter(self.filter).data
-                self.filteredPlot.plot(self.time_array, self.filtered_buffer)
+                self.filteredCurve.setData(self.time_array, self.filtered_buffer.view().copy())
         else:
             if hasattr(self, 'signal'):
                 self.inputPlot.clear()
                 self.filteredPlot.clear()
-                self.inputPlot.plot(self.signal.time, self.signal.data)
-                if hasattr(self, 'filter'):
-                    filtered_signal = self.signal.apply_filter(self.filter)
-                    self.filteredPlot.plot(filtered_signal.time, filtered_signal.data)
+                # Multi-channel signals are filtered whole; only the first channel is shown
+                self.inputPlot.plot(self.signal.time, self.signal.channel(0))
+                if self.filtered_signal is not None:
+                    self.filteredPlot.plot(self.filtered_signal.time, self.filtered_signal.channel(0))
         
         # self.updatePlotLimits()
 
@@ -213,13 +257,14 @@ class FilterUsageWidget(QtWidgets.QWidget):
         try:
             if self.real_time_mode:
                 if hasattr(self, 'signal_buffer') and hasattr(self, 'filtered_buffer'):
-                    yMin = min(np.min(self.signal_buffer), np.min(self.filtered_buffer)) * 1.1
-                    yMax = max(np.max(self.signal_buffer), np.max(self.filtered_buffer)) * 1.1
+                    signal_window, filtered_window = self.signal_buffer.view(), self.filtered_buffer.view()
+                    yMin = min(np.min(signal_window), np.min(filtered_window)) * 1.1
+                    yMax = max(np.max(signal_window), np.max(filtered_window)) * 1.1
             else:
                 if hasattr(self, 'signal') and self.signal is not None:
                     xMax = len(self.signal.data) / self.signal.sampling_rate
-                    yMin = np.min(self.signal.data) * 1.1
-                    yMax = np.max(self.signal.data) * 1.1
+                    yMin = np.min(self.signal.channel(0)) * 1.1
+                    yMax = np.max(self.signal.channel(0)) * 1.1
 
             if not all(map(np.isfinite, [xMin, xMax, yMin, yMax])):
                 return
@@ -232,7 +277,7 @@ class FilterUsageWidget(QtWidgets.QWidget):
 
     def setFilter(self, filter_obj):
         self.filter = filter_obj
-        self.filter.subscribe(self.updatePlots, self)
+        self.filter.subscribe_async(self.filterSignal, self.showFilteredSignal, self)
 
 
 if __name__ == "__main__":
@@ -3,21 +3,24 @@ from PySide6.QtWidgets import (QMainWindow, QWidget, QTabWidget, QVBoxLayout,
                               QMessageBox)
 from PySide6.QtCore import Qt
 import matplotlib.pyplot as plt
-from scipy import signal
 
 from Filter import Filter
-from PlotsWidget import FilterPlotsWidget
+from FilterDesign import design_filter
+from DesignSpecDialog import DesignSpecDialog
+from PlotsWidget import create_filter_plots_widget
 from ZPlaneWidget import ZPlaneWidget
 from ElementsListWidget import ElementsListWidget
 from FilterUsageWidget import FilterUsageWidget
 from AllPassFilter import AllPassFiltersListWidget
 from FilterVisualizer import FilterVisualizer
 from FilterCodeGenerator import FilterCodeGenerator
+from SubscriberDispatcher import SubscriberDispatcher
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, plots_backend=None):
         super().__init__()
+        self.plots_backend = plots_backend
         self.setWindowTitle("Digital Filter Designer")
         self.setMinimumSize(1200, 800)
         self.showMaximized()
@@ -30,6 +33,10 @@ class MainWindow(QMainWindow):
         self.filter = Filter()
         self.filter_realizer = FilterVisualizer(self.filter)
         self.code_generator = FilterCodeGenerator(self.filter)
+
+        # Run expensive subscribers (signal filtering) off the GUI thread
+        self.dispatcher = SubscriberDispatcher(parent=self)
+        self.filter.set_dispatcher(self.dispatcher)
         
         self.setup_ui()
         self.setup_menu_bar()
@@ -64,7 +71,7 @@ class MainWindow(QMainWindow):
         right_layout = QVBoxLayout(right_panel)
         
         self.zplane_widget = ZPlaneWidget()
-        self.plots_widget = FilterPlotsWidget()
+        self.plots_widget = create_filter_plots_widget(self.plots_backend)
         
         right_layout.addWidget(self.zplane_widget)
         right_layout.addWidget(self.plots_widget)
@@ -92,6 +99,10 @@ class MainWindow(QMainWindow):
         self.plots_widget.set_filter(self.filter)
         self.usage_widget.setFilter(self.filter)
         
+    def closeEvent(self, event):
+        self.dispatcher.shutdown()
+        super().closeEvent(event)
+
     def setup_menu_bar(self):
         menubar = self.menuBar()
         
@@ -105,6 +116,10 @@ class MainWindow(QMainWindow):
         # Import from file action
         import_file_action = import_menu.addAction("From File...")
         import_file_action.triggered.connect(self.import_filter_from_file)
+
+        # Minimum-order design from a passband/stopband spec
+        design_spec_action = import_menu.addAction("Design From Spec...")
+        design_spec_action.triggered.connect(self.design_from_spec)
         
         # Filter Library submenu
         filter_library = import_menu.addMenu("Filter Library")
@@ -143,8 +158,13 @@ class MainWindow(QMainWindow):
         cascade_action = block_diagram_menu.addAction("Cascade Form")
         direct_form_action = block_diagram_menu.addAction("Direct Form II")
         
-        # C Code export action
-        c_code_action = export_menu.addAction("Generate C Code")
+        # C Code export submenu, one action per filter structure
+        c_code_menu = export_menu.addMenu("Generate C Code")
+        c_code_actions = [
+            (c_code_menu.addAction("Direct Form II"), "direct"),
+            (c_code_menu.addAction("Cascade (Direct Form I Biquads)"), "cascade_df1"),
+            (c_code_menu.addAction("Cascade (Transposed Direct Form II Biquads)"), "cascade_df2t"),
+        ]
         
         # Filter export action
         export_menu.addSeparator()  # Add separator line
@@ -153,7 +173,8 @@ class MainWindow(QMainWindow):
         # Connect export actions
         cascade_action.triggered.connect(self.show_cascade_form)
         direct_form_action.triggered.connect(self.show_direct_form)
-        c_code_action.triggered.connect(self.generate_c_code)
+        for action, structure in c_code_actions:
+            action.triggered.connect(lambda checked=False, structure=structure: self.generate_c_code(structure))
         save_filter_action.triggered.connect(self.save_filter)
     
     def on_tab_changed(self, index):
@@ -251,7 +272,7 @@ class MainWindow(QMainWindow):
             else:
                 return
 
-    def generate_c_code(self):
+    def generate_c_code(self, structure="direct"):
         file_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save C Code",
@@ -261,7 +282,7 @@ class MainWindow(QMainWindow):
 
         if file_path:
             try:
-                header_path, source_path = self.code_generator.export_c_code(file_path)
+                header_path, source_path = self.code_generator.export_c_code(file_path, structure=structure)
             except ValueError as e:
                 response = QMessageBox.question(
                     self,
@@ -271,7 +292,7 @@ class MainWindow(QMainWindow):
                 )
                 if response == QMessageBox.Yes:
                     self.filter.auto_realize_filter()
-                    header_path, source_path = self.code_generator.export_c_code(file_path)
+                    header_path, source_path = self.code_generator.export_c_code(file_path, structure=structure)
                 else:
                     return
             except Exception as e:
@@ -308,51 +329,30 @@ class MainWindow(QMainWindow):
                 )
             
     def import_well_known_filter(self, filter_type, response):
-        # Clear existing filter
-        self.filter.zeros = []
-        self.filter.poles = []
+        # Default design parameters, cutoffs normalized to Nyquist
+        cutoff = (0.3, 0.7) if response == "bpf" else 0.5
+        self.load_design(filter_type, response, order=4, cutoff=cutoff, ripple=1, attenuation=40)
+
+    def design_from_spec(self):
+        dialog = DesignSpecDialog(self)
+        if dialog.exec():
+            design = dialog.get_selected_design()
+            if design is not None:
+                self.load_design(design['family'], design['response'], design['order'], design['cutoff'],
+                                 design['ripple'], design['attenuation'])
+
+    def load_design(self, family, response, order, cutoff, ripple=None, attenuation=None):
+        """Replace the filter with a design from FilterDesign"""
+        # Clear existing all-pass filters
         self.filter.all_pass_filters = []
-        
-        # Define filter parameters
-        order = 4  # Default filter order
-        cutoff = 0.5  # Normalized cutoff frequency (0 to 1)
-        ripple = 1  # Passband ripple in dB (for Chebyshev)
-        stopband_attenuation = 40  # Stopband attenuation in dB (for elliptic)
-        
-        # Calculate analog prototype
-        if filter_type == "butterworth":
-            z, p, k = signal.butter(order, cutoff, analog=True, output='zpk')
-        elif filter_type == "chebyshev":
-            z, p, k = signal.cheby1(order, ripple, cutoff, analog=True, output='zpk')
-        elif filter_type == "inverse_chebyshev":
-            z, p, k = signal.cheby2(order, stopband_attenuation, cutoff, analog=True, output='zpk')
-        elif filter_type == "bessel":
-            z, p, k = signal.bessel(order, cutoff, analog=True, output='zpk')
-        elif filter_type == "elliptic":
-            z, p, k = signal.ellip(order, ripple, stopband_attenuation, cutoff, analog=True, output='zpk')
-        
-        # Transform to digital filter using bilinear transform
-        z_d, p_d, k_d = signal.bilinear_zpk(z, p, k, fs=4)
-        
-        # Convert to high-pass if needed
-        if response == "hpf":
-            z_d = [-1 if x == 1 else 1 if x == -1 else -x for x in z_d]
-            p_d = [-1 if x == 1 else 1 if x == -1 else -x for x in p_d]
-        
-        # Convert to band-pass if needed
-        elif response == "bpf":
-            # Define band edges
-            low_freq = 0.3
-            high_freq = 0.7
-            z_d, p_d, k_d = signal.lp2bp_zpk(z_d, p_d, k_d, low_freq, high_freq)
-        
-        # Update filter
-        self.filter.zeros = [complex(x.real, x.imag) for x in z_d]
-        self.filter.poles = [complex(x.real, x.imag) for x in p_d]
-        self.filter.gain = float(k_d.real)
-        
-        # Notify subscribers
-        self.filter.notify_subscribers()
+        self.filter.parse_all_pass_filters()
+
+        parameters = {'ripple': ripple, 'attenuation': attenuation}
+        zeros, poles, gain = design_filter(family, response, order, cutoff,
+                                           **{name: value for name, value in parameters.items() if value is not None})
+
+        # Update filter and notify subscribers
+        self.filter.update_from_zpk(zeros, poles, gain)
 
     def save_filter(self):
         file_path, _ = QFileDialog.getSaveFileName(
@@ -381,9 +381,15 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     from PySide6.QtWidgets import QApplication
+    import argparse
     import sys
+
+    parser = argparse.ArgumentParser(description="Digital Filter Designer")
+    parser.add_argument("--plots-backend", choices=["matplotlib", "pyqtgraph"],
+                        help="Frequency response plots backend (default: $FILTER_PLOTS_BACKEND or matplotlib)")
+    args, qt_args = parser.parse_known_args()
     
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(plots_backend=args.plots_backend)
     window.show()
     sys.exit(app.exec())
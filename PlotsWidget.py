@@ -1,6 +1,9 @@
+import os
 import sys
 import numpy as np
 from math import gcd
+import pyqtgraph as pg
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QWidget, QHBoxLayout
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
@@ -10,51 +13,180 @@ from logger_config import setup_logger
 
 logger = setup_logger(__name__)
 
+# Environment variable that selects the plots backend at startup ('matplotlib' or 'pyqtgraph')
+PLOTS_BACKEND_ENV = 'FILTER_PLOTS_BACKEND'
+
+
+def format_pi_ticks(x, pos=None):
+    """Format tick labels in terms of multiples of π/4, with simplifications."""
+    multiple = 4  # Denominator for π multiples
+    x_pi = x / np.pi
+    rounded_x_pi = round(x_pi * multiple) / multiple  # Round to nearest multiple of π/4
+
+    if rounded_x_pi == 0:
+        return "0"
+    elif rounded_x_pi == 1:
+        return "π"
+    elif rounded_x_pi == -1:
+        return "-π"
+    elif rounded_x_pi.is_integer():
+        return f"{int(rounded_x_pi)}π"
+    else:
+        # Simplify the fraction
+        numerator = int(rounded_x_pi * multiple)
+        denominator = multiple
+        divisor = gcd(abs(numerator), denominator)  # Compute GCD for simplification
+        numerator //= divisor
+        denominator //= divisor
+
+        if denominator == 1:  # Case where the fraction simplifies to a whole number
+            return f"{numerator}π"
+        elif numerator == 1:  # Avoid "1π/denominator"
+            return f"π/{denominator}"
+        elif numerator == -1:  # Avoid "-1π/denominator"
+            return f"-π/{denominator}"
+        else:
+            return f"{numerator}π/{denominator}"
+
+
+def _hysteresis_limits(current, target, low, high, step):
+    """
+    Keep the current limits while the data range [low, high] fits inside them and they are
+    at most one step looser than target on either side, otherwise move to target.
+    """
+    if current is not None:
+        current_low, current_high = current
+        if (current_low <= low and high <= current_high and
+                current_low >= target[0] - step and current_high <= target[1] + step):
+            return tuple(current)
+    return target
+
+
+def magnitude_limits(magnitude_db, current=None, step=10.0, limit=300, dynamic_range=120):
+    """
+    Y limits for a magnitude plot in dB, rounded outwards to step with one step of margin.
+
+    Deep stopband nulls jump between frequency bins as roots move, so the floor is clamped
+    to dynamic_range below the peak, and the limits only follow the data when it leaves
+    the current limits or they become too loose.
+    """
+    high = min(np.max(magnitude_db), limit)
+    low = max(np.min(magnitude_db), -limit, high - dynamic_range)
+    target = step * (np.floor(low / step) - 1), step * (np.ceil(high / step) + 1)
+    return _hysteresis_limits(current, target, low, high, step)
+
+
+def group_delay_limits(group_delay, limit=1000, current=None):
+    """Y limits for a group delay plot, rounded outwards so that small changes keep them"""
+    finite = group_delay[np.isfinite(group_delay)]
+    if finite.size == 0:
+        return -1.0, 1.0
+    low, high = max(np.min(finite), -limit), min(np.max(finite), limit)
+    step = 10.0 ** np.floor(np.log10(max(high - low, 1.0)))
+    target = step * (np.floor(low / step) - 1), step * (np.ceil(high / step) + 1)
+    return _hysteresis_limits(current, target, low, high, step)
+
+
+def create_filter_plots_widget(backend=None, parent=None):
+    """Create the response plots widget for the given backend, defaulting to $FILTER_PLOTS_BACKEND"""
+    backend = backend or os.environ.get(PLOTS_BACKEND_ENV, 'matplotlib')
+    if backend == 'matplotlib':
+        return FilterPlotsWidget(parent)
+    if backend == 'pyqtgraph':
+        return PyQtGraphFilterPlotsWidget(parent)
+    raise ValueError(f"Unknown plots backend: {backend}")
+
 
 class FilterPlotsWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setMinimumSize(800, 400)
-        self.setup_ui()
+        self.setMinimumSize(1200, 400)
         self.w = None
         self.magnitude_db = None
         self.phase = None
+        self.group_delay = None
+        self.cursor_x = None
+        self.setup_ui()
 
     def setup_ui(self):
         # Create main layout
         layout = QHBoxLayout(self)
 
-        # Create figure with two subplots
-        self.figure = Figure(figsize=(8, 4))
+        # Create figure with three subplots
+        self.figure = Figure(figsize=(12, 4))
         self.canvas = FigureCanvas(self.figure)
         layout.addWidget(self.canvas)
 
         # Create magnitude subplot
-        self.mag_ax = self.figure.add_subplot(121)
-        self.mag_ax.set_title('Magnitude Response')
+        self.mag_ax = self.figure.add_subplot(131)
+        self.mag_ax.set_title('Magnitude Response', pad=18)
         self.mag_ax.set_xlabel('ω (rad/sample)')
         self.mag_ax.set_ylabel('Magnitude (dB)')
         self.mag_ax.grid(True)
 
         # Create phase subplot
-        self.phase_ax = self.figure.add_subplot(122)
-        self.phase_ax.set_title('Phase Response')
+        self.phase_ax = self.figure.add_subplot(132)
+        self.phase_ax.set_title('Phase Response', pad=18)
         self.phase_ax.set_xlabel('ω (rad/sample)')
         self.phase_ax.set_ylabel('Phase (rad)')
         self.phase_ax.grid(True)
 
-        # Adjust layout to prevent overlapping
-        self.figure.tight_layout()
+        # Create group delay subplot
+        self.delay_ax = self.figure.add_subplot(133)
+        self.delay_ax.set_title('Group Delay', pad=18)
+        self.delay_ax.set_xlabel('ω (rad/sample)')
+        self.delay_ax.set_ylabel('Group delay (samples)')
+        self.delay_ax.grid(True)
+
+        # Axis decorations never change, so they are set up once instead of on every update
+        for ax in [self.mag_ax, self.phase_ax, self.delay_ax]:
+            ax.set_xlim(0, np.pi)
+            # Set major ticks at multiples of π/4
+            ax.xaxis.set_major_locator(MultipleLocator(np.pi / 4))
+            ax.xaxis.set_major_formatter(FuncFormatter(self.format_pi_ticks))
+            # Rotate x-axis labels for better readability
+            ax.tick_params(axis='x', rotation=45)
+
+        # Set phase y-axis limits and ticks at multiples of π/4
+        self.phase_ax.set_ylim(-np.pi, np.pi)
+        self.phase_ax.yaxis.set_major_locator(MultipleLocator(np.pi / 4))
+        self.phase_ax.yaxis.set_major_formatter(FuncFormatter(self.format_pi_ticks))
 
-        # Initialize plot lines
-        self.mag_line = None
-        self.phase_line = None
+        # Add horizontal lines at ±π for reference
+        self.phase_ax.axhline(y=np.pi, color='r', linestyle='--', alpha=0.5)
+        self.phase_ax.axhline(y=-np.pi, color='r', linestyle='--', alpha=0.5)
 
-        # Store vertical lines for cursor interaction
-        self.mag_vline = None
-        self.phase_vline = None
+        # Persistent artists that change with the filter or the cursor. They are animated,
+        # i.e. left out of full redraws and blitted on top of the cached background.
+        self.mag_line, = self.mag_ax.plot([], [], animated=True)
+        self.phase_line, = self.phase_ax.plot([], [], animated=True)
+        self.delay_line, = self.delay_ax.plot([], [], animated=True)
+        self.mag_vline = self.mag_ax.axvline(x=0, color='k', linestyle=':', alpha=0.5,
+                                             animated=True, visible=False)
+        self.phase_vline = self.phase_ax.axvline(x=0, color='k', linestyle=':', alpha=0.5,
+                                                 animated=True, visible=False)
+        self.delay_vline = self.delay_ax.axvline(x=0, color='k', linestyle=':', alpha=0.5,
+                                                 animated=True, visible=False)
+        # Cursor readouts sit between the title and the axes; only this short text is re-rendered
+        self.mag_readout = self.mag_ax.annotate('', xy=(0.5, 1), xycoords='axes fraction', xytext=(0, 3),
+                                                textcoords='offset points', ha='center', va='bottom',
+                                                animated=True)
+        self.phase_readout = self.phase_ax.annotate('', xy=(0.5, 1), xycoords='axes fraction', xytext=(0, 3),
+                                                    textcoords='offset points', ha='center', va='bottom',
+                                                    animated=True)
+        self.delay_readout = self.delay_ax.annotate('', xy=(0.5, 1), xycoords='axes fraction', xytext=(0, 3),
+                                                    textcoords='offset points', ha='center', va='bottom',
+                                                    animated=True)
+        self.animated_artists = [self.mag_line, self.phase_line, self.delay_line,
+                                 self.mag_vline, self.phase_vline, self.delay_vline,
+                                 self.mag_readout, self.phase_readout, self.delay_readout]
+        self.background = None
+
+        # Adjust layout to prevent overlapping
+        self.figure.tight_layout()
 
-        # Connect mouse events
+        # Connect canvas events
+        self.canvas.mpl_connect('draw_event', self.on_draw)
         self.canvas.mpl_connect('motion_notify_event', self.on_mouse_move)
 
         # Initialize filter reference
@@ -62,129 +194,208 @@ class FilterPlotsWidget(QWidget):
 
     def set_filter(self, filter_instance):
         """Connect to a filter instance"""
-        filter_instance.subscribe(self.update_plots, self)
+        filter_instance.subscribe(self.update_plots, self, live=True)
 
     def format_pi_ticks(self, x, pos):
         """Format tick labels in terms of multiples of π/4, with simplifications."""
-        multiple = 4  # Denominator for π multiples
-        x_pi = x / np.pi
-        rounded_x_pi = round(x_pi * multiple) / multiple  # Round to nearest multiple of π/4
-
-        if rounded_x_pi == 0:
-            return "0"
-        elif rounded_x_pi == 1:
-            return "π"
-        elif rounded_x_pi == -1:
-            return "-π"
-        elif rounded_x_pi.is_integer():
-            return f"{int(rounded_x_pi)}π"
-        else:
-            # Simplify the fraction
-            numerator = int(rounded_x_pi * multiple)
-            denominator = multiple
-            divisor = gcd(abs(numerator), denominator)  # Compute GCD for simplification
-            numerator //= divisor
-            denominator //= divisor
-
-            if denominator == 1:  # Case where the fraction simplifies to a whole number
-                return f"{numerator}π"
-            elif numerator == 1:  # Avoid "1π/denominator"
-                return f"π/{denominator}"
-            elif numerator == -1:  # Avoid "-1π/denominator"
-                return f"-π/{denominator}"
-            else:
-                return f"{numerator}π/{denominator}"
+        return format_pi_ticks(x, pos)
 
     def update_plots(self, filter_instance=None):
-        """Update both plots with new filter response"""
+        """Update the plots with new filter response"""
+
+        # Get frequency response (evaluated from the roots, so moving one root is an O(n_freqs) update)
+        self.w, self.magnitude_db, self.phase = filter_instance.get_frequency_response(method='zpk')
+        _, self.group_delay = filter_instance.get_group_delay(len(self.w))
+
+        self.mag_line.set_data(self.w, self.magnitude_db)
+        self.phase_line.set_data(self.w, self.phase)
+        self.delay_line.set_data(self.w, self.group_delay)
+        self.update_readout()
+
+        # Y limits only change when the data outgrows them or they get too loose,
+        # so that small changes don't force a full redraw
+        ylim = magnitude_limits(self.magnitude_db, current=self.mag_ax.get_ylim())
+        delay_ylim = group_delay_limits(self.group_delay, current=self.delay_ax.get_ylim())
+
+        if ylim != self.mag_ax.get_ylim() or delay_ylim != self.delay_ax.get_ylim():
+            # Tick labels change with the limits, so the background has to be redrawn
+            self.mag_ax.set_ylim(*ylim)
+            self.delay_ax.set_ylim(*delay_ylim)
+            self.canvas.draw_idle()
+        else:
+            self.blit()
+
+    def update_readout(self):
+        """Show the response at the cursor position above the plots"""
+        if self.cursor_x is None or self.w is None:
+            return
+
+        idx = np.abs(self.w - self.cursor_x).argmin()
+        w_str = f'{self.cursor_x / np.pi:.2f}π'
+        logger.debug(f'w: {w_str}, mag: {self.magnitude_db[idx]}, phase: {self.phase[idx]}')
+        self.mag_readout.set_text(f'ω = {w_str}: {self.magnitude_db[idx]:.1f} dB')
+        self.phase_readout.set_text(f'ω = {w_str}: {self.phase[idx]:.2f} rad')
+        self.delay_readout.set_text(f'ω = {w_str}: {self.group_delay[idx]:.2f} samples')
+
+    def on_draw(self, event):
+        """Cache the static background after a full redraw and paint the animated artists on it"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_animated_artists()
+
+    def draw_animated_artists(self):
+        for artist in self.animated_artists:
+            self.figure.draw_artist(artist)
+
+    def blit(self):
+        """Redraw only the animated artists over the cached background"""
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_animated_artists()
+        self.canvas.blit(self.figure.bbox)
+
+    def on_mouse_move(self, event):
+        """Handle mouse movement to show frequency response at cursor"""
+        if event.inaxes in [self.mag_ax, self.phase_ax, self.delay_ax] and event.xdata is not None:
+            self.cursor_x = event.xdata
 
-        # Get frequency response
-        self.w, self.magnitude_db, self.phase = filter_instance.get_frequency_response()
+            # Move the vertical lines to the cursor x-position
+            for vline in [self.mag_vline, self.phase_vline, self.delay_vline]:
+                vline.set_xdata([event.xdata, event.xdata])
+                vline.set_visible(True)
 
-        self.mag_ax.clear()
-        self.mag_ax.plot(self.w, self.magnitude_db)
-        self.mag_ax.grid(True)
-        self.mag_ax.set_title('Magnitude Response')
-        self.mag_ax.set_xlabel('ω (rad/sample)')
-        self.mag_ax.set_ylabel('Magnitude (dB)')
+            self.update_readout()
+            self.blit()
 
-        # Set reasonable y-axis limits for magnitude
-        min_mag = max(min(self.magnitude_db), -300)  # Limit to -100 dB
-        max_mag = min(max(self.magnitude_db), 300)  # Limit to 100 dB
-        self.mag_ax.set_ylim(min_mag - 10, max_mag + 10)
+    def resizeEvent(self, event):
+        """Handle widget resize"""
+        super().resizeEvent(event)
+        # The canvas redraws after resizing, which also refreshes the cached background
+        self.figure.tight_layout()
 
-        # # Add horizontal line at -3dB for reference
-        # self.mag_ax.axhline(y=-3, color='r', linestyle='--', alpha=0.5)
-        # self.mag_ax.text(self.w[1], -3, '-3 dB', verticalalignment='bottom')
 
-        self.phase_ax.clear()
-        self.phase_ax.plot(self.w, self.phase)
-        self.phase_ax.grid(True)
-        self.phase_ax.set_title('Phase Response')
-        self.phase_ax.set_xlabel('ω (rad/sample)')
-        self.phase_ax.set_ylabel('Phase (rad)')
+class PiAxisItem(pg.AxisItem):
+    """Axis with major ticks at multiples of π/4, labelled as fractions of π"""
+
+    def tickValues(self, minVal, maxVal, size):
+        spacing = np.pi / 4
+        # Small tolerance so ticks at exactly 0 and π on the range edges are kept
+        first, last = np.ceil(minVal / spacing - 1e-6), np.floor(maxVal / spacing + 1e-6)
+        return [(spacing, list(np.arange(first, last + 1) * spacing))]
+
+    def tickStrings(self, values, scale, spacing):
+        return [format_pi_ticks(value) for value in values]
 
-        # Set reasonable y-axis limits for phase
-        self.phase_ax.set_ylim(-np.pi, np.pi)
+
+class PyQtGraphFilterPlotsWidget(QWidget):
+    """pyqtgraph implementation of FilterPlotsWidget, fast enough to follow live drags"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(1200, 400)
+        self.w = None
+        self.magnitude_db = None
+        self.phase = None
+        self.group_delay = None
+        self.cursor_x = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        # Create main layout
+        layout = QHBoxLayout(self)
+
+        # Create magnitude plot
+        self.mag_plot = pg.PlotWidget(title='Magnitude Response', axisItems={'bottom': PiAxisItem('bottom')})
+        self.mag_plot.setLabel('bottom', 'ω (rad/sample)')
+        self.mag_plot.setLabel('left', 'Magnitude (dB)')
+
+        # Create phase plot
+        self.phase_plot = pg.PlotWidget(title='Phase Response',
+                                        axisItems={'bottom': PiAxisItem('bottom'), 'left': PiAxisItem('left')})
+        self.phase_plot.setLabel('bottom', 'ω (rad/sample)')
+        self.phase_plot.setLabel('left', 'Phase (rad)')
+        self.phase_plot.setYRange(-np.pi, np.pi, padding=0)
+
+        # Create group delay plot
+        self.delay_plot = pg.PlotWidget(title='Group Delay', axisItems={'bottom': PiAxisItem('bottom')})
+        self.delay_plot.setLabel('bottom', 'ω (rad/sample)')
+        self.delay_plot.setLabel('left', 'Group delay (samples)')
 
         # Add horizontal lines at ±π for reference
-        self.phase_ax.axhline(y=np.pi, color='r', linestyle='--', alpha=0.5)
-        self.phase_ax.axhline(y=-np.pi, color='r', linestyle='--', alpha=0.5)
+        for y in [np.pi, -np.pi]:
+            self.phase_plot.addItem(pg.InfiniteLine(pos=y, angle=0, pen=pg.mkPen('r', style=Qt.DashLine)))
+
+        self.cursor_lines = []
+        for plot in [self.mag_plot, self.phase_plot, self.delay_plot]:
+            plot.showGrid(x=True, y=True)
+            plot.setXRange(0, np.pi, padding=0)
+            plot.setMouseEnabled(x=False, y=False)
+            plot.hideButtons()
+
+            # Vertical line that follows the cursor
+            cursor_line = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen((150, 150, 150), style=Qt.DotLine))
+            cursor_line.setVisible(False)
+            plot.addItem(cursor_line)
+            self.cursor_lines.append(cursor_line)
+
+            plot.scene().sigMouseMoved.connect(lambda pos, plot=plot: self.on_mouse_move(plot, pos))
+            layout.addWidget(plot)
+
+        # Persistent curves, updated in place with setData
+        self.mag_curve = self.mag_plot.plot()
+        self.phase_curve = self.phase_plot.plot()
+        self.delay_curve = self.delay_plot.plot()
 
-        # Set x-axis limits for both plots
-        self.mag_ax.set_xlim(0, np.pi)
-        self.phase_ax.set_xlim(0, np.pi)
+        # Initialize filter reference
+        self.filter = None
 
-        # Set ticks for both plots
-        for ax in [self.mag_ax, self.phase_ax]:
-            # Set major ticks at multiples of π/4
-            ax.xaxis.set_major_locator(MultipleLocator(np.pi / 4))
-            ax.xaxis.set_major_formatter(FuncFormatter(self.format_pi_ticks))
+    def set_filter(self, filter_instance):
+        """Connect to a filter instance"""
+        filter_instance.subscribe(self.update_plots, self, live=True)
 
-        # Set phase y-axis ticks at multiples of π/4
-        self.phase_ax.yaxis.set_major_locator(MultipleLocator(np.pi / 4))
-        self.phase_ax.yaxis.set_major_formatter(FuncFormatter(self.format_pi_ticks))
+    def format_pi_ticks(self, x, pos=None):
+        """Format tick labels in terms of multiples of π/4, with simplifications."""
+        return format_pi_ticks(x, pos)
 
-        # Rotate x-axis labels for better readability
-        for ax in [self.mag_ax, self.phase_ax]:
-            ax.tick_params(axis='x', rotation=45)
+    def update_plots(self, filter_instance=None):
+        """Update the plots with new filter response"""
+        self.w, self.magnitude_db, self.phase = filter_instance.get_frequency_response(method='zpk')
+        _, self.group_delay = filter_instance.get_group_delay(len(self.w))
 
-        # Update canvas
-        self.figure.tight_layout()
-        self.canvas.draw()
+        self.mag_curve.setData(self.w, self.magnitude_db)
+        self.phase_curve.setData(self.w, self.phase)
+        self.delay_curve.setData(self.w, self.group_delay)
 
-    def on_mouse_move(self, event):
+        # Set reasonable y-axis limits for magnitude
+        min_mag = max(np.min(self.magnitude_db), -300)  # Limit to -300 dB
+        max_mag = min(np.max(self.magnitude_db), 300)  # Limit to 300 dB
+        self.mag_plot.setYRange(min_mag - 10, max_mag + 10, padding=0)
+        self.delay_plot.setYRange(*group_delay_limits(self.group_delay), padding=0)
+
+        self.update_readout()
+
+    def update_readout(self):
+        """Show the response at the cursor position in the plot titles"""
+        if self.cursor_x is None or self.w is None:
+            return
+
+        idx = np.abs(self.w - self.cursor_x).argmin()
+        w_str = f'{self.cursor_x / np.pi:.2f}π'
+        self.mag_plot.setTitle(f'Magnitude Response<br>ω = {w_str}: {self.magnitude_db[idx]:.1f} dB')
+        self.phase_plot.setTitle(f'Phase Response<br>ω = {w_str}: {self.phase[idx]:.2f} rad')
+        self.delay_plot.setTitle(f'Group Delay<br>ω = {w_str}: {self.group_delay[idx]:.2f} samples')
+
+    def on_mouse_move(self, plot, pos):
         """Handle mouse movement to show frequency response at cursor"""
-        if event.inaxes in [self.mag_ax, self.phase_ax]:
-            # Remove old vertical lines
-            if self.mag_vline:
-                self.mag_vline.remove()
-            if self.phase_vline:
-                self.phase_vline.remove()
-
-            # Add new vertical lines at cursor x-position
-            self.mag_vline = self.mag_ax.axvline(x=event.xdata, color='k', linestyle=':', alpha=0.5)
-            self.phase_vline = self.phase_ax.axvline(x=event.xdata, color='k', linestyle=':', alpha=0.5)
-
-            # Get nearest frequency response values
-            if self.w is not None:
-                idx = np.abs(self.w - event.xdata).argmin()
-
-                # Update titles with current values
-                w_str = f'{event.xdata / np.pi:.2f}π'
-                logger.debug(f'w_str: {w_str}')
-                logger.debug(f'idx: {idx}')
-                logger.debug(f'mag: {self.magnitude_db[idx]}')
-                logger.debug(f'phase: {self.phase[idx]}')
-                self.mag_ax.set_title(f'Magnitude Response\nω = {w_str}: {self.magnitude_db[idx]:.1f} dB')
-                self.phase_ax.set_title(f'Phase Response\nω = {w_str}: {self.phase[idx]:.2f} rad')
-
-            self.canvas.draw()
+        if not plot.sceneBoundingRect().contains(pos):
+            return
 
-    def resizeEvent(self, event):
-        """Handle widget resize"""
-        super().resizeEvent(event)
-        self.figure.tight_layout()
+        self.cursor_x = plot.getPlotItem().vb.mapSceneToView(pos).x()
+        for cursor_line in self.cursor_lines:
+            cursor_line.setPos(self.cursor_x)
+            cursor_line.setVisible(True)
+        self.update_readout()
 
 
 if __name__ == '__main__':
@@ -198,7 +409,7 @@ if __name__ == '__main__':
     filter.zeros = [1]
 
     # Create and show plots widget
-    plots = FilterPlotsWidget()
+    plots = create_filter_plots_widget()
     plots.set_filter(filter)
     plots.update_plots(filter)
     plots.show()
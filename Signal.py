@@ -1,32 +1,538 @@
+import json
+import re
+import struct
+import time
+import warnings
+from pathlib import Path
+
 import numpy as np
 from numpy.typing import NDArray
 from scipy import signal
+
+from logger_config import setup_logger
+
+try:
+    import pandas as pd  # C parser, much faster than numpy's text readers for large files
+except ImportError:
+    pd = None
+
+logger = setup_logger(__name__)
+
+DEFAULT_SAMPLING_RATE = 1000  # Used when a CSV file carries no sampling rate, in Hz
+FFT_TAP_THRESHOLD = 128  # form='auto' convolves FIR filters longer than this via FFT
+_SAMPLING_RATE_PATTERN = re.compile(r'sampling_rate\s*[=:]\s*([0-9.eE+-]+)')
+
+
+def read_sampling_rate(csv_file_path):
+    """
+    Read the sampling rate of a CSV signal, or return None if it doesn't specify one.
+
+    It is taken from a '# sampling_rate=<Hz>' comment line at the top of the file, or from
+    a JSON sidecar next to it ('<name>.json' with a "sampling_rate" key).
+    """
+    with open(csv_file_path, 'r') as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            match = _SAMPLING_RATE_PATTERN.search(line)
+            if match:
+                return float(match.group(1))
+
+    return read_sidecar_sampling_rate(csv_file_path)
+
+
+def read_sidecar_sampling_rate(file_path):
+    """Sampling rate from the '<name>.json' sidecar of a signal file, or None"""
+    sidecar_path = Path(file_path).with_suffix('.json')
+    if sidecar_path.is_file():
+        with open(sidecar_path, 'r') as f:
+            sampling_rate = json.load(f).get('sampling_rate')
+        if sampling_rate is not None:
+            return float(sampling_rate)
+
+    return None
+
+
+def _count_comment_lines(csv_file_path):
+    """Number of leading '#' lines, which are skipped before the header"""
+    count = 0
+    with open(csv_file_path, 'r') as f:
+        for line in f:
+            if not line.startswith('#'):
+                break
+            count += 1
+    return count
+
+
+def _numeric_columns(csv_file_path, skip_rows):
+    """Indices of the columns whose first data row parses as a number"""
+    with open(csv_file_path, 'r') as f:
+        for _ in range(skip_rows):
+            f.readline()
+        fields = f.readline().strip().split(',')
+
+    columns = []
+    for index, field in enumerate(fields):
+        try:
+            float(field)
+        except ValueError:
+            continue
+        columns.append(index)
+    return columns
+
+
+def iter_csv_chunks(csv_file_path, chunk_size=1_000_000, skip_header=1):
+    """
+    Read the numeric columns of a CSV file in chunks of up to chunk_size rows.
+
+    Yields 1-D arrays for single-column files and (rows x channels) arrays otherwise;
+    non-numeric columns such as timestamps or labels are skipped.
+    """
+    skip_rows = _count_comment_lines(csv_file_path) + skip_header
+    columns = _numeric_columns(csv_file_path, skip_rows)
+    if not columns:
+        return
+
+    if pd is not None:
+        reader = pd.read_csv(csv_file_path, header=None, skiprows=skip_rows, chunksize=chunk_size,
+                             usecols=columns, engine='c', dtype=np.float64)
+        with reader:
+            for chunk in reader:
+                yield _squeeze_columns(chunk.to_numpy())
+        return
+
+    with open(csv_file_path, 'r') as f:
+        for _ in range(skip_rows):
+            f.readline()
+        while True:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)  # loadtxt warns when it reaches the end
+                chunk = np.loadtxt(f, delimiter=',', max_rows=chunk_size, usecols=columns, ndmin=2)
+            if len(chunk) == 0:
+                return
+            yield _squeeze_columns(chunk)
+
+
+def _squeeze_columns(data):
+    return data[:, 0] if data.shape[1] == 1 else data
+
+
+# Binary signal container (.dsig): a fixed 32-byte little-endian header followed by the raw
+# samples in row-major (samples x channels) order, so the data can be memory-mapped in place.
+#   magic 'DSIG' | version u16 | channels u16 | sampling rate f64 | samples u64 | dtype str (8 bytes)
+BINARY_MAGIC = b'DSIG'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<4sHHdQ8s')
+
+
+def write_binary_header(f, n_samples, n_channels, sampling_rate, dtype):
+    dtype = np.dtype(dtype).newbyteorder('<')
+    f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, n_channels, sampling_rate,
+                               n_samples, dtype.str.encode('ascii')))
+
+
+def read_binary_header(file_path):
+    """Return (n_samples, n_channels, sampling_rate, dtype) of a .dsig file"""
+    with open(file_path, 'rb') as f:
+        header = f.read(BINARY_HEADER.size)
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError(f"{file_path} is too short to be a signal file")
+
+    magic, version, n_channels, sampling_rate, n_samples, dtype = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"{file_path} is not a signal file")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported signal file version: {version}")
+
+    return n_samples, n_channels, sampling_rate, np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+
+
+def lfilter_along_samples(b, a, data, zi=None):
+    """
+    lfilter along axis 0 of 1-D or (samples x channels) data, with zi shaped (order, ...).
+
+    lfilter walks the last axis much faster than a strided one, so multi-channel data is
+    filtered channel-major and transposed back.
+    """
+    if data.ndim == 1:
+        return signal.lfilter(b, a, data) if zi is None else signal.lfilter(b, a, data, zi=zi)
+
+    channel_major = np.ascontiguousarray(np.moveaxis(data, 0, -1))
+    if zi is None:
+        return np.moveaxis(signal.lfilter(b, a, channel_major), -1, 0)
+    filtered, zf = signal.lfilter(b, a, channel_major, zi=np.moveaxis(zi, 0, -1))
+    return np.moveaxis(filtered, -1, 0), np.moveaxis(zf, -1, 0)
+
+
+def _taps_along_samples(taps, data):
+    """Reshape FIR taps to broadcast against data along axis 0"""
+    return np.reshape(taps, (-1,) + (1,) * (data.ndim - 1))
+
+
+def fft_convolve(taps, data):
+    """
+    Causal FIR filtering by overlap-add FFT convolution along axis 0.
+
+    Equivalent to lfilter(taps, 1, data) at O(log(taps)) instead of O(taps) per sample;
+    oaconvolve picks the FFT block size from the tap count.
+    """
+    if len(data) == 0:
+        return np.zeros(data.shape)
+    return signal.oaconvolve(data, _taps_along_samples(taps, data), mode='full', axes=0)[:len(data)]
+
+
+def _odd_extension(data, padlen):
+    """Extend data along axis 0 by padlen samples reflected about each end sample, as filtfilt does"""
+    return np.concatenate([2 * data[:1] - data[padlen:0:-1], data,
+                           2 * data[-1:] - data[-2:-padlen - 2:-1]])
+
+
+def _fft_convolve_from_steady_state(taps, data):
+    """fft_convolve as if the first sample had been held forever, like lfilter with zi = lfilter_zi * x[0]"""
+    history = np.repeat(data[:1], len(taps) - 1, axis=0)
+    return fft_convolve(taps, np.concatenate([history, data]))[len(taps) - 1:]
+
+
+def fft_filtfilt(taps, data):
+    """
+    Zero-phase FIR filtering with FFT convolutions, matching filtfilt(taps, 1, data, axis=0).
+
+    Like filtfilt, the data is oddly extended at both ends and each pass starts from the
+    steady state of its first sample, so 'auto' switching to 'fft' doesn't change the edges.
+    """
+    padlen = zero_phase_padding('fft', taps)
+    if len(data) <= padlen:
+        raise ValueError(f"The length of the input vector x must be greater than padlen, which is {padlen}.")
+    forward = _fft_convolve_from_steady_state(taps, _odd_extension(data, padlen))
+    backward = _fft_convolve_from_steady_state(taps, forward[::-1])[::-1]
+    return backward[padlen:-padlen]
+
+
+def filter_samples(form, coefficients, data, zero_phase=False):
+    """
+    Filter data along axis 0 with coefficients from get_filter_coefficients.
+
+    zero_phase runs the filter forward and backward (sosfiltfilt/filtfilt semantics), which
+    cancels the phase response and squares the magnitude response.
+    """
+    if len(data) == 0:
+        # sosfilt and the zero-phase filters reject empty input
+        return np.zeros(data.shape)
+
+    if form == 'fft':
+        if zero_phase:
+            return fft_filtfilt(coefficients, data)
+        return fft_convolve(coefficients, data)
+
+    if form == 'sos':
+        if zero_phase:
+            return signal.sosfiltfilt(coefficients, data, axis=0)
+        return signal.sosfilt(coefficients, data, axis=0)
+
+    Numerator, Denominator = coefficients
+    if zero_phase:
+        return signal.filtfilt(Numerator, Denominator, data, axis=0)
+    return lfilter_along_samples(Numerator, Denominator, data)
+
+
+def zero_phase_padding(form, coefficients):
+    """Samples of edge extension sosfiltfilt/filtfilt add on each side by default"""
+    if form == 'fft':
+        return 3 * len(coefficients)
+    if form == 'sos':
+        return 3 * (2 * len(coefficients) + 1)
+    Numerator, Denominator = coefficients
+    return 3 * max(len(Numerator), len(Denominator))
+
+
+def get_filter_coefficients(filter_obj, form='sos'):
+    """
+    Resolve the execution form for a filter and return (form, coefficients).
+
+    For 'sos' the coefficients are the cascade sections including the all-pass filters,
+    for 'direct' they are the (numerator, denominator) transfer function and for 'fft' they
+    are FIR taps; an IIR filter's impulse response is truncated at its decay length.
+    'auto' picks 'fft' for FIR filters longer than FFT_TAP_THRESHOLD taps, 'direct' for
+    shorter FIR filters and 'sos' otherwise.
+    """
+    if form not in ('sos', 'direct', 'fft', 'auto'):
+        raise ValueError(f"Unknown filter form: {form}")
+
+    if form in ('fft', 'auto'):
+        b, a = filter_obj.get_transfer_function()
+        if not np.any(a[1:]):  # Poles only at the origin: FIR
+            taps = np.asarray(b) / a[0]
+            # Drop trailing zero taps, but keep one so an all-zero filter still outputs zeros
+            taps = taps[:max(len(np.trim_zeros(taps, 'b')), 1)]
+            if form == 'fft' or len(taps) > FFT_TAP_THRESHOLD:
+                return 'fft', taps
+            return 'direct', (taps, np.ones(1))
+        if form == 'fft':
+            return 'fft', np.asarray(filter_obj.get_impulse_response(filter_obj.get_decay_length()))
+        form = 'sos'
+
+    if form == 'sos' and filter_obj.is_realizable():
+        return 'sos', filter_obj.get_cascade_form()
+
+    return 'direct', filter_obj.get_transfer_function()
+
+
 class DigitalSignal:
+    """
+    A sampled signal; data is either 1-D or (samples x channels), with time along axis 0.
+    """
+
     def __init__(self, data, sampling_rate = 100):
-        self.data = np.array(data)
+        self.data = np.asarray(data)  # No copy, so memory-mapped data stays on disk
         self.sampling_rate = sampling_rate
-        self.time = np.arange(len(data)) / sampling_rate
+        self._time = None
 
-    def apply_filter(self, filter_obj):
+    @property
+    def time(self):
+        """Sample times in seconds, computed on first use"""
+        if self._time is None:
+            self._time = np.arange(len(self.data)) / self.sampling_rate
+        return self._time
+
+    @property
+    def n_channels(self):
+        return 1 if self.data.ndim == 1 else self.data.shape[1]
+
+    def channel(self, index):
+        """The samples of one channel as a 1-D view"""
+        return self.data if self.data.ndim == 1 else self.data[:, index]
+
+    def apply_filter(self, filter_obj, form='auto', zero_phase=False):
         """
         Apply a filter to the signal.
+
+        form='sos' runs the filter as cascaded second-order sections, which stays stable
+        for high-order designs; form='direct' uses the direct-form transfer function;
+        form='fft' convolves with the FIR taps (or truncated IIR impulse response) via FFT.
+        form='auto' uses FFT convolution for long FIR filters and sections otherwise.
+        Filters with complex coefficients (not realizable) use the direct form instead of 'sos'.
+        Multi-channel data is filtered in a single call along the sample axis.
+        zero_phase filters forward and backward for a phase-free output.
         """
+        form, coefficients = get_filter_coefficients(filter_obj, form)
 
-        Numerator, Denominator = filter_obj.get_transfer_function()
-        
-        filtered_data = signal.lfilter(Numerator, Denominator, self.data)
+        filtered_data = filter_samples(form, coefficients, self.data, zero_phase)
 
         filtered_data = np.real(filtered_data)
             
         return DigitalSignal(filtered_data, self.sampling_rate)
+
+    def apply_filter_to_file(self, filter_obj, output_path, form='auto', block_size=1_000_000,
+                             zero_phase=False, decay_db=-80):
+        """
+        Filter the signal block by block into a .dsig file and return the result memory-mapped.
+
+        No more than block_size samples (plus overlap) are held in memory at a time, so memory-mapped
+        signals larger than RAM can be filtered. The causal output is bit-identical to apply_filter
+        with the same form, except for FFT convolution, which matches to rounding error.
+
+        With zero_phase, each block is filtered forward and backward inside a window extended on
+        both sides by the filter's decay length (see Filter.get_decay_length) and the overlap is
+        discarded; the result matches apply_filter(zero_phase=True) to within decay_db.
+        """
+        if zero_phase:
+            blocks = self._iter_zero_phase_blocks(filter_obj, form, block_size, decay_db)
+        else:
+            stream = self.stream_filter(filter_obj, form)
+            blocks = (stream.process(self.data[start:start + block_size])
+                      for start in range(0, len(self.data), block_size))
+        n_samples = len(self.data)
+
+        start_time = time.perf_counter()
+        with open(output_path, 'wb') as f:
+            write_binary_header(f, n_samples, self.n_channels, self.sampling_rate, np.float64)
+            for filtered_block in blocks:
+                f.write(filtered_block.astype('<f8', copy=False).tobytes())
+        elapsed = time.perf_counter() - start_time
+
+        logger.info(f'Filtered {n_samples} samples into {output_path} in {elapsed:.2f} s '
+                    f'({n_samples / max(elapsed, 1e-9):,.0f} samples/s)')
+        return DigitalSignal.open_binary(output_path)
+
+    def _iter_zero_phase_blocks(self, filter_obj, form, block_size, decay_db):
+        """Zero-phase filtered blocks, computed over overlapping windows"""
+        form, coefficients = get_filter_coefficients(filter_obj, form)
+        # The padding keeps every window longer than the edge extension filtfilt needs
+        overlap = filter_obj.get_decay_length(decay_db) + zero_phase_padding(form, coefficients)
+        n_samples = len(self.data)
+
+        for start in range(0, n_samples, block_size):
+            end = min(start + block_size, n_samples)
+            window_start, window_end = max(start - overlap, 0), min(end + overlap, n_samples)
+            filtered_window = filter_samples(form, coefficients, self.data[window_start:window_end],
+                                             zero_phase=True)
+            yield np.real(filtered_window[start - window_start:end - window_start])
+
+    def stream_filter(self, filter_obj, form='sos'):
+        """
+        Create a streaming filter for chunks sampled at this signal's rate.
+        """
+        return StreamingFilter(filter_obj, self.sampling_rate, form)
     
     @classmethod
-    def convert_to_numpy(cls, csv_file_path, skip_header=1):
+    def convert_to_numpy(cls, csv_file_path, skip_header=1, sampling_rate=None, chunk_size=1_000_000):
         """
         Convert a csv file to a numpy array and return a DigitalSignal instance.
+
+        Without an explicit sampling_rate it is read from the file (see read_sampling_rate),
+        falling back to 1 kHz.
+        """
+        if sampling_rate is None:
+            sampling_rate = read_sampling_rate(csv_file_path) or DEFAULT_SAMPLING_RATE
+
+        start_time = time.perf_counter()
+        chunks = list(iter_csv_chunks(csv_file_path, chunk_size, skip_header))
+        data = np.concatenate(chunks) if chunks else np.zeros(0)
+        elapsed = time.perf_counter() - start_time
+
+        logger.info(f'Loaded {len(data)} rows from {csv_file_path} in {elapsed:.2f} s '
+                    f'({len(data) / max(elapsed, 1e-9):,.0f} rows/s)')
+        return cls(data, sampling_rate=sampling_rate)
+
+    @classmethod
+    def load(cls, file_path, sampling_rate=None):
+        """
+        Load a signal from a .csv, .dsig or .npy file; binary files are memory-mapped, not read.
+        """
+        suffix = Path(file_path).suffix.lower()
+        if suffix == '.dsig':
+            return cls.open_binary(file_path)
+        if suffix == '.npy':
+            if sampling_rate is None:
+                sampling_rate = read_sidecar_sampling_rate(file_path) or DEFAULT_SAMPLING_RATE
+            return cls(np.load(file_path, mmap_mode='r'), sampling_rate=sampling_rate)
+        return cls.convert_to_numpy(file_path, sampling_rate=sampling_rate)
+
+    @classmethod
+    def open_binary(cls, file_path, mode='r'):
         """
-        data = np.genfromtxt(csv_file_path, delimiter=',', skip_header=skip_header)
-        return cls(data, sampling_rate=1000)  # Default 1kHz sampling rate
+        Open a .dsig signal file as a memory-mapped DigitalSignal without reading it into memory.
+        """
+        n_samples, n_channels, sampling_rate, dtype = read_binary_header(file_path)
+        shape = (n_samples,) if n_channels == 1 else (n_samples, n_channels)
+        if n_samples == 0:
+            return cls(np.zeros(shape, dtype=dtype), sampling_rate=sampling_rate)
+
+        data = np.memmap(file_path, dtype=dtype, mode=mode, offset=BINARY_HEADER.size, shape=shape)
+        return cls(data, sampling_rate=sampling_rate)
+
+    def save_binary(self, file_path, dtype=None, block_size=1_000_000):
+        """
+        Write the signal to a .dsig file, block by block so memory-mapped data is never loaded whole.
+        """
+        dtype = np.dtype(self.data.dtype if dtype is None else dtype).newbyteorder('<')
+        with open(file_path, 'wb') as f:
+            write_binary_header(f, len(self.data), self.n_channels, self.sampling_rate, dtype)
+            for start in range(0, len(self.data), block_size):
+                f.write(np.ascontiguousarray(self.data[start:start + block_size], dtype=dtype).tobytes())
+
+    @classmethod
+    def iter_csv(cls, csv_file_path, chunk_size=1_000_000, skip_header=1, sampling_rate=None):
+        """
+        Read a csv file as a sequence of DigitalSignal chunks of up to chunk_size samples.
+        """
+        if sampling_rate is None:
+            sampling_rate = read_sampling_rate(csv_file_path) or DEFAULT_SAMPLING_RATE
+
+        for chunk in iter_csv_chunks(csv_file_path, chunk_size, skip_header):
+            yield cls(chunk, sampling_rate=sampling_rate)
+
+
+class StreamingFilter:
+    """
+    Filter a signal chunk by chunk, carrying the delay-line state (zi) between calls.
+
+    Feeding consecutive chunks through process() gives the same output as a single
+    DigitalSignal.apply_filter over the concatenated input, at O(len(chunk)) cost per call.
+    Chunks are 1-D or (samples x channels); the state is shaped from the first chunk.
+    For the 'fft' form the state is the overlap-add tail of the previous chunks' convolutions.
+    """
+
+    def __init__(self, filter_obj, sampling_rate=100, form='sos'):
+        self.sampling_rate = sampling_rate
+        self.form, self.coefficients = get_filter_coefficients(filter_obj, form)
+        self.samples_processed = 0
+        self.zi = None
+        self.reset()
+
+    def reset(self):
+        """Clear the delay line, as if no samples had been processed yet."""
+        self.zi = None
+        self.samples_processed = 0
+
+    def _initial_state(self, channel_shape):
+        if self.form == 'fft':
+            return np.zeros((len(self.coefficients) - 1,) + channel_shape,
+                            dtype=np.result_type(self.coefficients, float))
+        if self.form == 'sos':
+            return np.zeros((len(self.coefficients), 2) + channel_shape)
+        b, a = self.coefficients
+        order = max(len(a), len(b)) - 1
+        return np.zeros((order,) + channel_shape, dtype=np.result_type(b, a, float))
+
+    def process(self, chunk):
+        """Filter the next chunk of samples and return the filtered samples."""
+        chunk = np.asarray(chunk)
+        if len(chunk) == 0:
+            return np.zeros(chunk.shape)
+        if self.zi is None:
+            self.zi = self._initial_state(chunk.shape[1:])
+
+        if self.form == 'fft':
+            convolved = signal.oaconvolve(chunk, _taps_along_samples(self.coefficients, chunk),
+                                          mode='full', axes=0)
+            convolved[:len(self.zi)] += self.zi
+            filtered_chunk, self.zi = convolved[:len(chunk)], convolved[len(chunk):]
+        elif self.form == 'sos':
+            filtered_chunk, self.zi = signal.sosfilt(self.coefficients, chunk, axis=0, zi=self.zi)
+        else:
+            b, a = self.coefficients
+            filtered_chunk, self.zi = lfilter_along_samples(b, a, chunk, zi=self.zi)
+        self.samples_processed += len(chunk)
+
+        return np.real(filtered_chunk)
+
+
+class SampleRingBuffer:
+    """
+    Fixed-size history of the most recent samples, preallocated once.
+
+    Every sample is written twice, at i and i + size, so the latest window is always the
+    contiguous slice buffer[index:index + size] and reading it never copies or rolls.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.buffer = np.zeros(2 * size)
+        self.index = 0  # Position of the oldest sample, i.e. where the next one is written
+
+    def clear(self):
+        self.buffer[:] = 0
+        self.index = 0
+
+    def push(self, samples):
+        """Append samples, dropping the oldest ones."""
+        samples = np.atleast_1d(samples)[-self.size:]
+        count = len(samples)
+
+        head = min(count, self.size - self.index)
+        for start in (self.index, self.index + self.size):
+            self.buffer[start:start + head] = samples[:head]
+
+        tail = count - head  # Samples that wrap around to the start
+        for start in (0, self.size):
+            self.buffer[start:start + tail] = samples[head:]
+
+        self.index = (self.index + count) % self.size
+
+    def view(self):
+        """The buffered samples in chronological order (a view, not a copy)."""
+        return self.buffer[self.index:self.index + self.size]
 
 
 # t = np.linspace(0, 1, 1000)
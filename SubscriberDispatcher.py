@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+from logger_config import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class SubscriberDispatcher(QObject):
+    """Run expensive filter subscribers on a thread pool and deliver their results on the GUI thread.
+
+    Every submission carries the filter revision it was computed for. A subscriber only ever
+    sees its newest revision: queued work for a superseded revision is cancelled or skipped
+    before it starts, and results that arrive after a newer revision was submitted are dropped.
+    """
+    # (instance, revision, apply callback, result) - emitted from worker threads, so the
+    # connection is queued and _deliver runs on the thread that owns the dispatcher
+    result_ready = Signal(object, int, object, object)
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='filter-subscriber')
+        self.latest_revisions = {}  # id(instance) -> newest revision submitted for it
+        self.pending = {}  # id(instance) -> future of the newest submission
+        self.result_ready.connect(self._deliver)
+
+    def submit(self, instance, revision, compute, apply, filter_snapshot):
+        """Schedule compute(filter_snapshot) for a subscriber, superseding its older work"""
+        key = id(instance)
+        self.latest_revisions[key] = revision
+
+        pending = self.pending.get(key)
+        if pending is not None:
+            pending.cancel()  # Only succeeds if it has not started yet
+
+        self.pending[key] = self.executor.submit(self._run, instance, revision, compute, apply, filter_snapshot)
+
+    def is_stale(self, instance, revision):
+        return self.latest_revisions.get(id(instance), revision) > revision
+
+    def _run(self, instance, revision, compute, apply, filter_snapshot):
+        if self.is_stale(instance, revision):
+            return
+        try:
+            result = compute(filter_snapshot)
+        except Exception:
+            logger.exception(f'Subscriber computation failed for revision {revision}')
+            return
+        if not self.is_stale(instance, revision):
+            self.result_ready.emit(instance, revision, apply, result)
+
+    def _deliver(self, instance, revision, apply, result):
+        if self.is_stale(instance, revision):
+            logger.debug(f'Dropping stale result for revision {revision}')
+            return
+        apply(result)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -2,7 +2,7 @@ import sys
 import numpy as np
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                                QCheckBox, QPushButton, QApplication, QToolTip)
-from PySide6.QtCore import Qt, QPointF, QRect
+from PySide6.QtCore import Qt, QPointF, QRect, QTimer
 from PySide6.QtGui import QPainter, QPen, QColor, QPixmap, QLinearGradient
 
 from logger_config import setup_logger
@@ -57,6 +57,14 @@ class ZPlaneWidget(QWidget):
         self.filter = None
         self._updating_from_filter = False
 
+        # Live preview: push drag positions to the filter at most once per interval,
+        # the timer fires with whatever position is current so intermediate moves coalesce
+        self.live_preview = True
+        self.preview_interval_ms = 16  # ~60 fps
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.timeout.connect(self.send_preview)
+
         self.trash_closed_icon = QPixmap("icons/trash-closed.png")
         self.trash_opened_icon = QPixmap("icons/trash-opened.png")
 
@@ -107,6 +115,10 @@ class ZPlaneWidget(QWidget):
         self.conjugate_checkbox.setChecked(True)
         self.conjugate_checkbox.clicked.connect(self.toggle_conjugate_mode)
 
+        self.live_preview_checkbox = QCheckBox("Live Preview")
+        self.live_preview_checkbox.setChecked(True)
+        self.live_preview_checkbox.clicked.connect(self.toggle_live_preview)
+
         self.undo_button = QPushButton("↩ Undo")
         self.redo_button = QPushButton("↪ Redo")
         self.undo_button.clicked.connect(self.undo)
@@ -115,6 +127,7 @@ class ZPlaneWidget(QWidget):
         top_controls.addWidget(self.zero_widget)
         top_controls.addWidget(self.pole_widget)
         top_controls.addWidget(self.conjugate_checkbox)
+        top_controls.addWidget(self.live_preview_checkbox)
         top_controls.addWidget(self.undo_button)
         top_controls.addWidget(self.redo_button)
         top_controls.addStretch()
@@ -165,7 +178,7 @@ class ZPlaneWidget(QWidget):
         self.save_state()
         self.update()
 
-    def notify_filter_change(self):
+    def notify_filter_change(self, preview=False):
         if self.filter:
             zeros = [z for z in self.zeros]
             poles = [p for p in self.poles]
@@ -176,7 +189,17 @@ class ZPlaneWidget(QWidget):
                 angle = np.angle(ap.position)
                 all_pass_filters.append({"a": a, "theta": angle})
 
-            self.filter.update_from_zplane(zeros, poles, all_pass_filters, self)
+            self.filter.update_from_zplane(zeros, poles, all_pass_filters, self, preview)
+
+    def schedule_preview(self):
+        """Queue a preview update unless one is already pending"""
+        if self.live_preview and not self.preview_timer.isActive():
+            self.preview_timer.start(self.preview_interval_ms)
+
+    def send_preview(self):
+        """Push the current drag position to the live subscribers"""
+        if self.dragging_item:
+            self.notify_filter_change(preview=True)
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -516,9 +539,13 @@ class ZPlaneWidget(QWidget):
 
             # Always update through the main element
             self.dragging_item.update_position(new_pos)
+            self.schedule_preview()
             self.update()
 
     def mouseReleaseEvent(self, event):
+        # The exact update below supersedes any pending preview
+        self.preview_timer.stop()
+
         if self.dragging_item:
             if self.trash_open:
                 self.delete_element(self.dragging_item, self.dragging_type)
@@ -593,6 +620,11 @@ class ZPlaneWidget(QWidget):
         self.notify_filter_change()
         return
 
+    def toggle_live_preview(self, state):
+        self.live_preview = self.live_preview_checkbox.isChecked()
+        if not self.live_preview:
+            self.preview_timer.stop()
+
     def add_element(self, position, element_type):
         """Add a new element with its conjugate pair"""
         new_element = ZPlaneElement(position)